@@ -1,16 +1,117 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-import sys, os
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, ValidationError
+from contextlib import asynccontextmanager
+from datetime import date, timedelta
+from typing import Literal
+import sys, os, io, csv, json, gzip, zlib, asyncio
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
 
 # Import managers
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from src.logic import UserManager, DonationManager, RequestManager
+from src.db import get_database_manager
+from src.logic import (
+    UserManager, DonationManager, RequestManager, Dashboard, SingleFlight, MISSING, cache_from_env,
+)
+from src.expiry import ExpiryScheduler
+from src.matching import MatchingEngine
+from src.search import SearchIndex
+from src.stats import StatsCollector
+from src.events import ChangeFeed, format_sse
+from src.metrics import Metrics, MetricsMiddleware
+from src.warmup import Warmup
+
+# ----------------- Managers -----------------
+metrics = Metrics(profile_slowest=int(os.getenv("PROFILE_SLOWEST", "0")))
+db = get_database_manager()
+metrics.instrument_db(db)
+flight = SingleFlight()
+donation_manager = DonationManager(db, flight=flight)
+request_manager = RequestManager(db, flight=flight, donations=donation_manager)
+user_manager = UserManager(db, flight=flight, donations=donation_manager, requests=request_manager)
+dashboard = Dashboard(user_manager, donation_manager, request_manager)
+expiry_scheduler = ExpiryScheduler(donation_manager)
+EXPIRY_SWEEP = os.getenv("EXPIRY_SWEEP", "1") == "1"
+INDEX_RELOAD_SECONDS = float(os.getenv("INDEX_RELOAD_SECONDS", "300"))
+matching_engine = MatchingEngine(donation_manager, request_manager, user_manager, interval=INDEX_RELOAD_SECONDS)
+search_index = SearchIndex(donation_manager, interval=INDEX_RELOAD_SECONDS)
+stats_collector = StatsCollector(
+    donation_manager, request_manager, interval=float(os.getenv("STATS_RECONCILE_SECONDS", "3600"))
+)
+change_feed = ChangeFeed(
+    buffer_size=int(os.getenv("FEED_BUFFER_SIZE", "100")),
+    history_size=int(os.getenv("FEED_HISTORY_SIZE", "1000")),
+)
+donation_manager.add_listener(change_feed.on_change)
+SSE_KEEPALIVE_SECONDS = 15
+DB_WARM_CONNECTIONS = int(os.getenv("DB_WARM_CONNECTIONS", "10"))
+write_behind_queues = {}
+if os.getenv("WRITE_BEHIND", "0") == "1":
+    write_behind_options = dict(
+        max_batch=int(os.getenv("WRITE_BEHIND_BATCH", "100")),
+        max_delay=float(os.getenv("WRITE_BEHIND_DELAY_MS", "0")) / 1000,
+        max_queue=int(os.getenv("WRITE_BEHIND_QUEUE_SIZE", "1000")),
+    )
+    write_behind_queues["donations"] = donation_manager.enable_write_behind(**write_behind_options)
+    write_behind_queues["requests"] = request_manager.enable_write_behind(**write_behind_options)
+
+async def start_background_jobs():
+    stats_collector.start()
+    if EXPIRY_SWEEP:
+        expiry_scheduler.start()
+
+warmup = Warmup()
+warmup.add("database", lambda: db.warm_up(DB_WARM_CONNECTIONS))
+warmup.add("donation_cache", donation_manager.get_available_donations)
+warmup.add("matching", matching_engine.load)
+warmup.add("search", search_index.load)
+warmup.add("background_jobs", start_background_jobs)
+
+metrics.add_gauges("donation_cache", donation_manager.cache.stats)
+metrics.add_gauges("singleflight", flight.stats)
+metrics.add_gauges("expiry", expiry_scheduler.stats)
+metrics.add_gauges("matching", matching_engine.stats)
+metrics.add_gauges("search", search_index.stats)
+metrics.add_gauges("stats", stats_collector.stats)
+metrics.add_gauges("change_feed", change_feed.stats)
+for name, queue in write_behind_queues.items():
+    metrics.add_gauges(f"write_behind_{name}", queue.stats)
+metrics.add_gauges("warmup", lambda: {"ready": int(warmup.ready), "ready_seconds": warmup.ready_seconds})
 
 # ----------------- App Setup -----------------
+@asynccontextmanager
+async def lifespan(app):
+    # Only cheap setup blocks startup; loading runs behind /readyz
+    await db.open()
+    change_feed.start()
+    matching_engine.start()
+    search_index.start()
+    for queue in write_behind_queues.values():
+        queue.start()
+    warmup.start()
+    try:
+        yield
+    finally:
+        await warmup.stop()
+        # Let queued inserts reach the database before it closes
+        for queue in write_behind_queues.values():
+            await queue.stop()
+        await expiry_scheduler.stop()
+        await stats_collector.stop()
+        await matching_engine.stop()
+        await search_index.stop()
+        await change_feed.stop()
+        await db.close()
+
 app = FastAPI(
     title="Food Donation and Surplus Management System API",
-    version="1.0"
+    version="1.0",
+    lifespan=lifespan,
 )
 
 # Allow CORS
@@ -21,11 +122,7 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-
-# ----------------- Managers -----------------
-user_manager = UserManager()
-donation_manager = DonationManager()
-request_manager = RequestManager()
+app.add_middleware(MetricsMiddleware, metrics=metrics)
 
 # ----------------- Data Models -----------------
 class UserCreate(BaseModel):
@@ -50,95 +147,493 @@ class RequestModel(BaseModel):
     donation_id: int
     ngo_email: str
 
+class StatusBatch(BaseModel):
+    ids: list[int]
+    status: str
+
+class Demand(BaseModel):
+    ngo_id: int
+    count: int = 1
+
+class MatchRun(BaseModel):
+    demand: list[Demand] = []
+
+# ----------------- Pagination -----------------
+MAX_PAGE_SIZE = 1000
+
+GZIP_MIN_SIZE = int(os.getenv("GZIP_MIN_SIZE", "1024"))
+
+def not_modified(request, etag):
+    """
+    304 response when the client's If-None-Match already names etag
+    """
+    tags = [t.strip() for t in request.headers.get("if-none-match", "").split(",")]
+    if etag in tags or "*" in tags:
+        return Response(status_code=304, headers={"ETag": etag})
+    return None
+
+def page_response(request, rows, key, limit, etag):
+    """
+    JSON response carrying its ETag, compressed above GZIP_MIN_SIZE, and
+    exposing the keyset cursor for the next page when a list page is full
+    """
+    body = json.dumps(rows).encode()
+    headers = {"ETag": etag, "Vary": "Accept-Encoding"}
+    if limit and len(rows) == limit:
+        headers["X-Next-After"] = str(rows[-1][key])
+    if len(body) >= GZIP_MIN_SIZE:
+        accepted = request.headers.get("accept-encoding", "")
+        if brotli is not None and "br" in accepted:
+            body = brotli.compress(body, quality=4)
+            headers["Content-Encoding"] = "br"
+        elif "gzip" in accepted:
+            body = gzip.compress(body, compresslevel=5)
+            headers["Content-Encoding"] = "gzip"
+    return Response(body, media_type="application/json", headers=headers)
+
+def ndjson_stream(pages):
+    """
+    Stream pages from a generator as newline-delimited JSON
+    """
+    async def generate():
+        async for page in pages:
+            yield "".join(json.dumps(row) + "\n" for row in page)
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+# ----------------- Export -----------------
+EXPORT_PAGE_SIZE = int(os.getenv("EXPORT_PAGE_SIZE", "1000"))
+
+EXPORT_COLUMNS = {
+    "donations": ["donation_id", "user_id", "food_item", "quantity", "expiry_date", "status", "created_at"],
+    "requests": ["request_id", "ngo_id", "ngo_name", "donation_id", "food_item", "status", "created_at"],
+}
+
+def flatten_request(row):
+    return {
+        **row,
+        "ngo_name": (row.get("ngo") or {}).get("name"),
+        "food_item": (row.get("donations") or {}).get("food_item"),
+    }
+
+def export_stream(pages, columns, fmt, compress, filename):
+    """
+    Stream keyset pages as CSV or JSON lines, optionally gzipped on the
+    fly. Only one page is held at a time, and the CSV header goes out
+    before the first query.
+    """
+    async def generate():
+        compressor = zlib.compressobj(6, zlib.DEFLATED, 31) if compress else None
+
+        def encode(text):
+            data = text.encode()
+            if compressor is None:
+                return data
+            return compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, columns, extrasaction="ignore")
+        if fmt == "csv":
+            writer.writeheader()
+            yield encode(buffer.getvalue())
+        async for page in pages:
+            buffer.seek(0)
+            buffer.truncate()
+            if fmt == "csv":
+                writer.writerows(page)
+            else:
+                for row in page:
+                    buffer.write(json.dumps({c: row.get(c) for c in columns}) + "\n")
+            yield encode(buffer.getvalue())
+        if compressor is not None:
+            yield compressor.flush()
+
+    media_type = "text/csv" if fmt == "csv" else "application/x-ndjson"
+    if compress:
+        media_type, filename = "application/gzip", filename + ".gz"
+    return StreamingResponse(generate(), media_type=media_type,
+                             headers={"Content-Disposition": f'attachment; filename="{filename}"'})
+
+async def flattened(pages, flatten):
+    async for page in pages:
+        yield [flatten(row) for row in page]
+
+# ----------------- Idempotency -----------------
+idempotency_cache = cache_from_env("IDEMPOTENCY", maxsize=10_000, ttl=86_400)
+metrics.add_gauges("idempotency_cache", idempotency_cache.stats)
+
+async def idempotent(key, fingerprint, handler):
+    """
+    Run handler once per Idempotency-Key and replay its outcome, success or
+    HTTP error, to retries. Concurrent retries share the first attempt.
+    Reusing a key for a different request is rejected with 422.
+    """
+    if not key:
+        return await handler()
+
+    async def first_attempt():
+        entry = idempotency_cache.get(key)
+        if entry is MISSING:
+            try:
+                outcome = (200, await handler())
+            except HTTPException as e:
+                outcome = (e.status_code, e.detail)
+            entry = (fingerprint, outcome)
+            idempotency_cache.set(key, entry, idempotency_cache.generation.value)
+        return entry
+
+    stored, (status_code, body) = await flight.do(("idempotency", key), first_attempt)
+    if stored != fingerprint:
+        raise HTTPException(status_code=422, detail="Idempotency-Key was already used for a different request")
+    if status_code != 200:
+        raise HTTPException(status_code=status_code, detail=body)
+    return body
+
+# ----------------- Bulk Ingest -----------------
+BULK_CHUNK_SIZE = int(os.getenv("BULK_CHUNK_SIZE", "500"))
+
+async def read_bulk_rows(request: Request):
+    """
+    Return an iterator of raw rows from a JSON array, a text/csv body or
+    a multipart upload in the "file" field
+    """
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        form = await request.form()
+        upload = form.get("file")
+        if upload is None or isinstance(upload, str):
+            raise HTTPException(status_code=400, detail="Upload a CSV file in the 'file' field")
+        return csv.DictReader(io.TextIOWrapper(upload.file, encoding="utf-8-sig"))
+    if content_type.startswith("text/csv"):
+        body = (await request.body()).decode("utf-8-sig")
+        return csv.DictReader(io.StringIO(body))
+    try:
+        rows = await request.json()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or CSV")
+    if not isinstance(rows, list):
+        raise HTTPException(status_code=400, detail="Body must be a JSON array or CSV")
+    return iter(rows)
+
+def validate_donation(raw):
+    """
+    Apply the DonationCreate rules to one raw row
+    """
+    if not isinstance(raw, dict):
+        raise ValueError("Row must be an object")
+    donation = DonationCreate(**raw)
+    return {
+        "user_id": donation.user_id,
+        "food_item": donation.food_item,
+        "quantity": donation.quantity,
+        "expiry_date": donation.expiry_date,
+    }
+
 # ----------------- Endpoints -----------------
 @app.get("/")
-def home():
+async def home():
     return {"message": "Food donation and surplus management system API is running!"}
 
+@app.get("/healthz")
+async def healthz():
+    return {"status": "ok"}
+
+@app.get("/readyz")
+async def readyz():
+    status = warmup.status()
+    if not status["ready"]:
+        return JSONResponse(status, status_code=503)
+    return status
+
+@app.get("/metrics")
+async def get_metrics():
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+@app.get("/metrics/slow")
+async def get_slowest_requests():
+    return metrics.slowest_requests()
+
 # ----------------- USERS -----------------
 @app.get("/users")
-def get_users():
-    return user_manager.get_users()
+async def get_users(request: Request, limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+                    after: int | None = None, stream: bool = False):
+    if stream:
+        return ndjson_stream(user_manager.iter_users())
+    etag = user_manager.etag(limit, after)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    rows = await user_manager.get_users(limit, after)
+    return page_response(request, rows, "user_id", limit, etag)
 
 @app.post("/users")
-def create_user(user: UserCreate):
-    result = user_manager.add_user(user.name, user.email, user.password, user.role)
+async def create_user(user: UserCreate):
+    result = await user_manager.add_user(user.name, user.email, user.password, user.role)
     if not result.get("Success"):
         raise HTTPException(status_code=400, detail=result.get("Message"))
     return result
 
 @app.put("/users/{user_id}")
-def update_user(user_id: int, user: UserUpdate):
-    result = user_manager.update_user(user_id, user.name, user.email, user.password, user.role)
+async def update_user(user_id: int, user: UserUpdate):
+    result = await user_manager.update_user(user_id, user.name, user.email, user.password, user.role)
     if not result.get("Success"):
         raise HTTPException(status_code=400, detail=result.get("Message"))
     return result
 
 @app.delete("/users/{user_id}")
-def delete_user(user_id: int):
-    result = user_manager.delete_user(user_id)
+async def delete_user(user_id: int):
+    result = await user_manager.delete_user(user_id)
     if not result.get("Success"):
         raise HTTPException(status_code=400, detail=result.get("Message"))
     return result
 
 # ----------------- DONATIONS -----------------
 @app.post("/donations")
-def create_donation(donation: DonationCreate):
-    result = donation_manager.add_donation(
+async def create_donation(donation: DonationCreate):
+    result = await donation_manager.add_donation(
         donation.user_id, donation.food_item, donation.quantity, donation.expiry_date
     )
     if not result.get("Success"):
         raise HTTPException(status_code=400, detail=result.get("Message"))
     return result
 
+@app.post("/donations/bulk")
+async def bulk_create_donations(request: Request, chunk_size: int = Query(BULK_CHUNK_SIZE, ge=1, le=5000)):
+    rows = await read_bulk_rows(request)
+    results, chunk = [], []
+    for number, raw in enumerate(rows, start=1):
+        try:
+            chunk.append((number, validate_donation(raw)))
+        except (ValidationError, ValueError, TypeError) as e:
+            results.append({"Row": number, "Success": False, "Message": str(e)})
+            continue
+        if len(chunk) >= chunk_size:
+            results.extend(await donation_manager.add_donations(chunk))
+            chunk = []
+    if chunk:
+        results.extend(await donation_manager.add_donations(chunk))
+    if not results:
+        raise HTTPException(status_code=400, detail="No rows to ingest")
+
+    results.sort(key=lambda r: r["Row"])
+    inserted = sum(1 for r in results if r["Success"])
+    return {
+        "Success": inserted == len(results),
+        "Message": f"{inserted} of {len(results)} donations added",
+        "Results": results,
+    }
+
 @app.get("/donations")
-def list_donations():
-    return donation_manager.get_available_donations()
+async def list_donations(request: Request, limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+                         after: int | None = None, stream: bool = False):
+    if stream:
+        return ndjson_stream(donation_manager.iter_available_donations())
+    etag = donation_manager.etag(limit, after)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    rows = await donation_manager.get_available_donations(limit, after)
+    return page_response(request, rows, "donation_id", limit, etag)
+
+@app.get("/donations/search")
+async def search_donations(q: str, limit: int = Query(20, ge=1, le=100)):
+    """
+    Available donations whose food item matches q (prefix and typo
+    tolerant), best matches first and soonest expiry first within a match
+    """
+    return search_index.search(q, limit)
+
+@app.get("/donations/stream")
+async def donation_stream(request: Request, follow: bool = True,
+                          last_event_id: str | None = Header(None)):
+    """
+    Server-Sent Events feed of donation insert/update/delete deltas.
+    With follow=false the missed events are sent and the response ends.
+    """
+    queue = change_feed.subscribe(last_event_id)
+
+    async def generate():
+        try:
+            while True:
+                if not follow and queue.empty():
+                    return
+                try:
+                    event = await asyncio.wait_for(queue.get(), timeout=SSE_KEEPALIVE_SECONDS)
+                except asyncio.TimeoutError:
+                    if await request.is_disconnected():
+                        return
+                    yield ": keep-alive\n\n"
+                    continue
+                if event is None:
+                    return
+                yield format_sse(event)
+        finally:
+            change_feed.unsubscribe(queue)
+
+    return StreamingResponse(generate(), media_type="text/event-stream",
+                             headers={"Cache-Control": "no-cache"})
+
+@app.put("/donations/status")
+async def update_donation_statuses(batch: StatusBatch):
+    result = await donation_manager.update_donation_statuses(batch.ids, batch.status)
+    if not result.get("Success"):
+        raise HTTPException(status_code=400, detail=result.get("Message"))
+    return result
 
 @app.put("/donations/{donation_id}/status")
-def update_donation_status(donation_id: int, status: str):
-    result = donation_manager.update_donation_status(donation_id, status)
+async def update_donation_status(donation_id: int, status: str):
+    result = await donation_manager.update_donation_status(donation_id, status)
     if not result.get("Success"):
         raise HTTPException(status_code=400, detail=result.get("Message"))
     return result
 
 @app.delete("/donations/{donation_id}")
-def delete_donation(donation_id: int):
-    result = donation_manager.delete_donation(donation_id)
+async def delete_donation(donation_id: int):
+    result = await donation_manager.delete_donation(donation_id)
     if not result.get("Success"):
         raise HTTPException(status_code=400, detail=result.get("Message"))
     return result
 
+@app.get("/expiry/stats")
+async def expiry_stats():
+    return expiry_scheduler.stats()
+
 # ----------------- REQUESTS -----------------
 @app.post("/requests")
-def create_request(req: RequestModel):
-    # Look up NGO by email
-    users = user_manager.get_users()
-    ngo_list = [u for u in users if u.get("email") == req.ngo_email and u.get("role") == "ngo"]
+async def create_request(req: RequestModel, idempotency_key: str | None = Header(None)):
+    async def claim():
+        # Look up NGO by email
+        ngo = await user_manager.find_user(req.ngo_email, role="ngo")
+        if ngo is None:
+            raise HTTPException(status_code=404, detail="NGO not found")
 
-    if not ngo_list:
-        raise HTTPException(status_code=404, detail="NGO not found")
+        ngo_id = ngo[0]
+        result = await request_manager.create_request(ngo_id, req.donation_id)
+        if result.get("Conflict"):
+            raise HTTPException(status_code=409, detail=result.get("Message"))
+        if not result.get("Success"):
+            raise HTTPException(status_code=400, detail=result.get("Message"))
+        return result
+
+    return await idempotent(idempotency_key, ("POST /requests", req.donation_id, req.ngo_email), claim)
+
+@app.get("/requests/{ngo_id}")
+async def list_requests(ngo_id: int, request: Request, limit: int | None = Query(None, ge=1, le=MAX_PAGE_SIZE),
+                        after: int | None = None, stream: bool = False):
+    if stream:
+        return ndjson_stream(request_manager.iter_requests_by_ngo(ngo_id))
+    etag = request_manager.etag(ngo_id, limit, after)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    rows = await request_manager.get_requests_by_ngo(ngo_id, limit, after)
+    return page_response(request, rows, "request_id", limit, etag)
 
-    ngo_id = ngo_list[0]["user_id"]
-    result = request_manager.create_request(ngo_id, req.donation_id)
+@app.put("/requests/status")
+async def update_request_statuses(batch: StatusBatch):
+    result = await request_manager.update_request_statuses(batch.ids, batch.status)
     if not result.get("Success"):
         raise HTTPException(status_code=400, detail=result.get("Message"))
     return result
 
-@app.get("/requests/{ngo_id}")
-def list_requests(ngo_id: int):
-    return request_manager.get_requests_by_ngo(ngo_id)
-
 @app.put("/requests/{request_id}/status")
-def update_request_status(request_id: int, status: str):
-    result = request_manager.update_request_status(request_id, status)
+async def update_request_status(request_id: int, status: str):
+    result = await request_manager.update_request_status(request_id, status)
     if not result.get("Success"):
         raise HTTPException(status_code=400, detail=result.get("Message"))
     return result
 
 @app.delete("/requests/{request_id}")
-def delete_request(request_id: int):
-    result = request_manager.delete_request(request_id)
+async def delete_request(request_id: int):
+    result = await request_manager.delete_request(request_id)
+    if not result.get("Success"):
+        raise HTTPException(status_code=400, detail=result.get("Message"))
+    return result
+
+# ----------------- EXPORT -----------------
+@app.get("/export/{table}")
+async def export(table: Literal["donations", "requests"], format: Literal["csv", "jsonl"] = "csv",
+                 since: date | None = None, until: date | None = None,
+                 compress: bool = Query(False, alias="gzip")):
+    """
+    Full export of donations or request history created between since and
+    until (inclusive dates)
+    """
+    start = since.isoformat() if since else None
+    end = (until + timedelta(days=1)).isoformat() if until else None
+    if table == "donations":
+        pages = donation_manager.iter_all_donations(start, end, EXPORT_PAGE_SIZE)
+    else:
+        pages = flattened(request_manager.iter_request_history(start, end, EXPORT_PAGE_SIZE), flatten_request)
+    return export_stream(pages, EXPORT_COLUMNS[table], format, compress, f"{table}.{format}")
+
+# ----------------- DASHBOARDS -----------------
+@app.get("/dashboard/ngo")
+async def ngo_dashboard(email: str, request: Request):
+    etag = dashboard.etag("ngo", email)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    data = await dashboard.ngo(email)
+    if data is None:
+        raise HTTPException(status_code=404, detail="NGO not found")
+    return page_response(request, data, None, None, etag)
+
+@app.get("/dashboard/donor")
+async def donor_dashboard(email: str, request: Request):
+    etag = dashboard.etag("donor", email)
+    cached = not_modified(request, etag)
+    if cached:
+        return cached
+    data = await dashboard.donor(email)
+    if data is None:
+        raise HTTPException(status_code=404, detail="Donor not found")
+    return page_response(request, data, None, None, etag)
+
+# ----------------- STATS -----------------
+@app.get("/stats")
+async def get_stats(days: int = Query(30, ge=1, le=366)):
+    return stats_collector.summary(days)
+
+@app.get("/stats/donors")
+async def get_donor_stats():
+    return stats_collector.donors()
+
+@app.get("/stats/donors/{user_id}")
+async def get_donor_stat(user_id: int):
+    return stats_collector.donor(user_id)
+
+@app.get("/stats/ngos")
+async def get_ngo_stats():
+    return stats_collector.ngos()
+
+@app.get("/stats/ngos/{ngo_id}")
+async def get_ngo_stat(ngo_id: int):
+    return stats_collector.ngo(ngo_id)
+
+# ----------------- MATCHING -----------------
+@app.get("/match/{ngo_id}")
+async def match_candidates(ngo_id: int, k: int = Query(10, ge=1, le=100)):
+    """
+    The most urgent donations for this NGO, leaving out any it has already
+    requested (a rejected donation is not offered back to the same NGO),
+    answered from the matching engine's memory
+    """
+    if not matching_engine.is_ngo(ngo_id):
+        raise HTTPException(status_code=404, detail="NGO not found")
+    return {"ngo_id": ngo_id, "candidates": matching_engine.top(k, ngo_id)}
+
+@app.post("/match/run")
+async def run_matching(run: MatchRun):
+    ngo_ids = sorted({demand.ngo_id for demand in run.demand})
+    ngos = await asyncio.gather(*(user_manager.get_user(ngo_id, "ngo") for ngo_id in ngo_ids))
+    unknown = [str(ngo_id) for ngo_id, ngo in zip(ngo_ids, ngos) if ngo is None]
+    if unknown:
+        raise HTTPException(status_code=422, detail=f"Not an NGO: {', '.join(unknown)}")
+    for demand in run.demand:
+        matching_engine.add_demand(demand.ngo_id, demand.count)
+    result = await matching_engine.run()
+    if result.get("Conflict"):
+        raise HTTPException(status_code=409, detail=result.get("Message"))
     if not result.get("Success"):
         raise HTTPException(status_code=400, detail=result.get("Message"))
     return result
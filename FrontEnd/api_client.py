@@ -0,0 +1,133 @@
+"""
+HTTP access to the API for the Streamlit app: one pooled keep-alive
+session per process, timeouts and retries with backoff, a short-lived
+read cache shared by every browser session, and parallel fan-out of
+independent reads.
+"""
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+API_URL = os.getenv("API_URL", "http://127.0.0.1:8000")
+API_TIMEOUT = float(os.getenv("API_TIMEOUT", "10"))
+API_CACHE_TTL = float(os.getenv("API_CACHE_TTL", "5"))
+RETRY_STATUSES = (502, 503, 504)
+
+
+def safe_json(response):
+    try:
+        return response.json()
+    except Exception:
+        return {"Success": False, "Message": response.text}
+
+
+class ApiClient:
+    """
+    Reads are cached for ttl seconds; an older copy is revalidated with
+    its ETag, so unchanged data comes back as an empty 304. Every write
+    made through the client expires the cache, so the rerun that follows
+    a write sees it.
+
+    Reads, updates and deletes are retried on connection errors and
+    gateway statuses. POSTs are only retried when they carry an
+    Idempotency-Key, which makes a replay safe.
+    """
+    def __init__(self, base_url=API_URL, ttl=API_CACHE_TTL, timeout=API_TIMEOUT,
+                 retries=3, backoff=0.2, pool_size=32, workers=8, maxsize=1024):
+        self.base_url = base_url
+        self.ttl = ttl
+        self.timeout = (3.05, timeout)
+        self.retries = retries
+        self.backoff = backoff
+        self.maxsize = maxsize
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_maxsize=pool_size, max_retries=Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=frozenset({"GET", "HEAD", "PUT", "DELETE"}),
+            raise_on_status=False,
+        ))
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.pool = ThreadPoolExecutor(max_workers=workers)
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+
+    def request(self, method, path, **kwargs):
+        kwargs.setdefault("timeout", self.timeout)
+        return self.session.request(method, f"{self.base_url}{path}", **kwargs)
+
+    def get(self, path, params=None):
+        """
+        Cached GET of a JSON route; None on failure
+        """
+        key = (path, tuple(sorted((params or {}).items())))
+        with self.lock:
+            entry = self.cache.get(key)
+        if entry and time.monotonic() - entry[2] < self.ttl:
+            return entry[1]
+        headers = {"If-None-Match": entry[0]} if entry and entry[0] else {}
+        try:
+            response = self.request("GET", path, params=params, headers=headers)
+        except requests.RequestException:
+            return None
+        if response.status_code == 304 and entry:
+            data = entry[1]
+        elif response.status_code == 200:
+            data = response.json()
+        else:
+            return None
+        with self.lock:
+            self.cache[key] = (response.headers.get("ETag"), data, time.monotonic())
+            self.cache.move_to_end(key)
+            while len(self.cache) > self.maxsize:
+                self.cache.popitem(last=False)
+        return data
+
+    def invalidate(self):
+        """
+        Expire every cached read; the copies are kept to revalidate with
+        """
+        with self.lock:
+            for key, (etag, data, _) in self.cache.items():
+                self.cache[key] = (etag, data, float("-inf"))
+
+    def write(self, method, path, idempotent=False, **kwargs):
+        """
+        Send a write and return its JSON result dict. idempotent POSTs get
+        an Idempotency-Key and are retried with it on transient failures.
+        """
+        headers = kwargs.pop("headers", {})
+        if idempotent:
+            headers["Idempotency-Key"] = str(uuid.uuid4())
+        # Other methods are already retried by the session's adapter
+        attempts = self.retries + 1 if idempotent else 1
+        try:
+            for attempt in range(attempts):
+                if attempt:
+                    time.sleep(self.backoff * 2 ** (attempt - 1))
+                try:
+                    response = self.request(method, path, headers=headers, **kwargs)
+                except requests.RequestException as e:
+                    if attempt + 1 == attempts:
+                        return {"Success": False, "Message": str(e)}
+                    continue
+                if response.status_code not in RETRY_STATUSES:
+                    break
+            return safe_json(response)
+        finally:
+            self.invalidate()
+
+    def gather(self, *calls):
+        """
+        Run independent zero-argument calls concurrently and return their
+        results in order
+        """
+        return [future.result() for future in [self.pool.submit(call) for call in calls]]
@@ -1,8 +1,7 @@
 import streamlit as st
-import requests
+import json
 from datetime import date
-
-API_URL = "http://127.0.0.1:8000"
+from api_client import ApiClient
 
 # ---------------- Custom CSS ----------------
 st.markdown(f"""
@@ -92,61 +91,92 @@ with col_left:
     st.markdown('</div>', unsafe_allow_html=True)
 
 # ---------------- Helpers ----------------
-def safe_json(response):
-    try:
-        return response.json()
-    except Exception:
-        return {"Success": False, "Message": response.text}
+@st.cache_resource
+def get_client():
+    """
+    One client per server process, so every browser session shares its
+    connection pool and read cache
+    """
+    return ApiClient()
 
-def get_users():
-    try:
-        response = requests.get(f"{API_URL}/users")
-        if response.status_code == 200:
-            return response.json()
-        return []
-    except Exception as e:
-        st.error(f"Error fetching users: {e}")
-        return []
+client = get_client()
 
 def register_user(name, email, password, role):
-    response = requests.post(f"{API_URL}/users", json={
+    return client.write("POST", "/users", json={
         "name": name, "email": email, "password": password, "role": role,
     })
-    return safe_json(response)
 
 def add_donation(user_id, item, quantity, expiry):
-    response = requests.post(f"{API_URL}/donations", json={
+    return client.write("POST", "/donations", json={
         "user_id": user_id, "food_item": item, "quantity": quantity, "expiry_date": expiry,
     })
-    return safe_json(response)
+
+def fetch_all_donations():
+    return {d["donation_id"]: d for d in client.get("/donations") or []}
+
+def parse_sse(text):
+    events = []
+    for block in text.split("\n\n"):
+        fields = {}
+        for line in block.splitlines():
+            name, _, value = line.partition(":")
+            if name in ("id", "event", "data"):
+                fields[name] = value.strip()
+        if "event" in fields:
+            events.append((fields.get("id"), fields["event"], json.loads(fields.get("data") or "[]")))
+    return events
 
 def get_donations():
-    response = requests.get(f"{API_URL}/donations")
-    if response.status_code == 200:
-        return response.json()
-    return []
+    """
+    Keep a local copy of available donations and apply the deltas from
+    /donations/stream instead of refetching the whole list on every rerun
+    """
+    state = st.session_state
+    headers = {"Last-Event-ID": state["donations_event_id"]} if "donations_event_id" in state else {}
+    try:
+        response = client.request("GET", "/donations/stream", params={"follow": "false"}, headers=headers)
+        events = parse_sse(response.text) if response.status_code == 200 else []
+    except Exception:
+        events = []
+    if not events and "donations" not in state:
+        state["donations"] = fetch_all_donations()
+    for event_id, kind, rows in events:
+        if kind == "reset":
+            state["donations"] = fetch_all_donations()
+        else:
+            for d in rows:
+                if kind != "delete" and d.get("status") == "available":
+                    state["donations"][d["donation_id"]] = d
+                else:
+                    state["donations"].pop(d["donation_id"], None)
+        state["donations_event_id"] = event_id
+    return sorted(state["donations"].values(), key=lambda d: d["donation_id"])
+
+def search_donations(query):
+    return client.get("/donations/search", {"q": query, "limit": 50}) or []
 
 def update_donation(donation_id, item, quantity, expiry):
-    response = requests.put(f"{API_URL}/donations/{donation_id}/status", params={"status": "available"})
-    return safe_json(response)
+    return client.write("PUT", f"/donations/{donation_id}/status", params={"status": "available"})
 
 def delete_donation(donation_id):
-    response = requests.delete(f"{API_URL}/donations/{donation_id}")
-    return safe_json(response)
+    return client.write("DELETE", f"/donations/{donation_id}")
 
 def request_donation(donation_id, ngo_email):
-    response = requests.post(f"{API_URL}/requests", json={"donation_id": donation_id, "ngo_email": ngo_email})
-    return safe_json(response)
+    # Keyed, so a retry after a dropped connection cannot claim twice
+    return client.write("POST", "/requests", idempotent=True,
+                        json={"donation_id": donation_id, "ngo_email": ngo_email})
 
-def get_requests_by_ngo(ngo_id):
-    response = requests.get(f"{API_URL}/requests/{ngo_id}")
-    if response.status_code == 200:
-        return response.json()
-    return []
+def get_dashboard(panel, email):
+    """
+    Everything a panel shows in one round trip; None if the email is not
+    registered in that role
+    """
+    if not email:
+        return None
+    return client.get(f"/dashboard/{panel}", {"email": email})
 
 def cancel_request(request_id):
-    response = requests.delete(f"{API_URL}/requests/{request_id}")
-    return safe_json(response)
+    return client.write("DELETE", f"/requests/{request_id}")
 
 # ---------------- Donor Panel ----------------
 if role == "Donor":
@@ -165,10 +195,9 @@ if role == "Donor":
 
         # Add donation
         st.subheader("🍱 Add Donation")
-        users = get_users()
-        donor_ids = [u.get("user_id") for u in users if u.get("role") == "donor"]
-        if donor_ids:
-            donor_id = donor_ids[-1]
+        dashboard = get_dashboard("donor", email)
+        if dashboard:
+            donor_id = dashboard["donor_id"]
             item = st.text_input("Item")
             quantity = st.number_input("Quantity", min_value=1, step=1)
             expiry = st.date_input("Expiry Date", value=date.today())
@@ -178,10 +207,12 @@ if role == "Donor":
 
         # View, Update, Remove donations
         st.subheader("📋 My Donations")
-        my_donations = [d for d in get_donations() if d.get("user_id") in donor_ids]
+        my_donations = [d for d in dashboard["donations"] if d.get("status") == "available"] if dashboard else []
         if my_donations:
             for d in my_donations:
                 with st.expander(f"🍛 {d['food_item']} - {d['quantity']} units (Expiry: {d['expiry_date']})"):
+                    if d["requests"]:
+                        st.markdown(f"📨 {len(d['requests'])} request(s)")
                     new_item = st.text_input("New Item", value=d["food_item"], key=f"ni{d['donation_id']}")
                     new_qty = st.number_input("New Qty", value=int(d["quantity"]), key=f"nq{d['donation_id']}")
                     new_exp = st.date_input("New Expiry", value=date.fromisoformat(d["expiry_date"]), key=f"ne{d['donation_id']}")
@@ -212,14 +243,19 @@ elif role == "NGO":
                 result = register_user(ngo_name, ngo_email, password, "ngo")
                 st.success(result.get("Message", "NGO registered!"))
 
-        # Get NGO ID
-        users = get_users()
-        ngo = next((u for u in users if u.get("email") == ngo_email and u.get("role") == "ngo"), None)
-        ngo_id = ngo["user_id"] if ngo else None
-
         # View donations
         st.subheader("📦 Available Donations")
-        donations = get_donations()
+        query = st.text_input("🔍 Search food items", placeholder="rice, bread, biryani...")
+
+        # Requests and open donations for this NGO in one call, fetched
+        # alongside the search results
+        if query:
+            dashboard, donations = client.gather(
+                lambda: get_dashboard("ngo", ngo_email), lambda: search_donations(query)
+            )
+        else:
+            dashboard = get_dashboard("ngo", ngo_email)
+            donations = dashboard["available"] if dashboard else get_donations()
         for d in donations:
             if d.get("status") == "available":
                 col1, col2 = st.columns([3,1])
@@ -239,13 +275,18 @@ elif role == "NGO":
 
         # View & cancel requests
         st.subheader("📑 My Requests")
-        if ngo_id:
-            requests_list = get_requests_by_ngo(ngo_id)
+        if dashboard:
+            requests_list = dashboard["requests"]
             if requests_list:
                 for r in requests_list:
                     col1, col2 = st.columns([3,1])
                     with col1:
-                        st.markdown(f"📌 Donation #{r['donation_id']} requested")
+                        info = r.get("donations")
+                        if info:
+                            st.markdown(f"📌 {info['food_item']} - {info['quantity']} units "
+                                        f"(Expiry: {info['expiry_date']}) · {r['status']}")
+                        else:
+                            st.markdown(f"📌 Donation #{r['donation_id']} · {r['status']}")
                     with col2:
                         if st.button("Cancel", key=f"cancel{r['request_id']}"):
                             result = cancel_request(r["request_id"])
@@ -0,0 +1,197 @@
+"""
+End-to-end API benchmark.
+
+    python -m benchmarks run --scale small --mode closed --concurrency 32 --out result.json
+    python -m benchmarks run --mode open --rps 200 --duration 20 --out result.json
+    python -m benchmarks compare baseline.json result.json --threshold 0.10
+    python -m benchmarks micro --only matching
+    python -m benchmarks startup --scale medium --workers 4 --repeat 5
+    python -m benchmarks postgrest --concurrency 1 100 500 --pool-size 10 100
+
+`run` seeds a SQLite database, boots API/main.py against it with uvicorn,
+drives every route on its own and then the realistic mix, and writes JSON.
+`compare` exits non-zero when p95 latency or throughput regressed by more
+than the threshold. `micro` runs the in-process component benchmarks.
+`startup` boots the API repeatedly and reports time to /healthz (live)
+and /readyz (warm-up done). `postgrest` drives the Supabase backend's
+pooled client against a local stub PostgREST server.
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from benchmarks.load import MIX, Workload, percentile, run_phase
+from benchmarks.micro import BENCHMARKS
+from benchmarks.postgrest import bench_postgrest
+from benchmarks.seed import SCALES, seed
+from benchmarks.server import APIServer
+
+
+def run(args):
+    scale = dict(SCALES[args.scale])
+    for name in ("users", "donations", "requests"):
+        if getattr(args, name) is not None:
+            scale[name] = getattr(args, name)
+    path = args.sqlite_path or os.path.join(tempfile.mkdtemp(prefix="food-bench-"), "bench.db")
+    seed(path, scale["users"], scale["donations"], scale["requests"], args.seed)
+
+    config = {k: v for k, v in vars(args).items() if k != "func"}
+    report = {"config": {**config, **scale, "sqlite_path": path}, "phases": {}}
+    with APIServer(path, workers=args.workers) as server:
+        report["startup_seconds"] = server.startup_seconds
+        report["ready_seconds"] = server.ready_seconds
+        phases = [(name, {name: 1}) for name in MIX] + [("mix", MIX)]
+        for name, operations in phases:
+            workload = Workload(scale["users"], scale["donations"], args.seed)
+            report["phases"][name] = asyncio.run(run_phase(
+                server, operations, workload, args.mode, args.concurrency, args.rps, args.duration
+            ))
+            print(f"{name}: {json.dumps(report['phases'][name]['routes'])}", file=sys.stderr)
+
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0
+
+
+def compare(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    with open(args.current) as f:
+        current = json.load(f)
+
+    warnings = [
+        f"{key} differs: {baseline['config'].get(key)} vs {current['config'].get(key)}"
+        for key in ("mode", "scale", "users", "donations", "requests", "concurrency", "rps", "workers")
+        if baseline.get("config", {}).get(key) != current.get("config", {}).get(key)
+    ]
+    regressions = []
+    for phase, result in current["phases"].items():
+        for route, stats in result["routes"].items():
+            before = baseline.get("phases", {}).get(phase, {}).get("routes", {}).get(route)
+            if not before:
+                continue
+            # Throughput and latency only count successful responses; a
+            # shift in refusals changes what is being measured
+            share = lambda r: r["requests"] / max(1, r["requests"] + r.get("rejected", 0) + r.get("errors", 0))
+            if abs(share(stats) - share(before)) > args.threshold:
+                warnings.append(f"{phase} {route}: success share {share(before):.0%} -> {share(stats):.0%}")
+            if before["p95_ms"] and stats["p95_ms"] > before["p95_ms"] * (1 + args.threshold):
+                regressions.append(f"{phase} {route}: p95 {before['p95_ms']:.2f}ms -> {stats['p95_ms']:.2f}ms")
+            if stats["throughput_rps"] < before["throughput_rps"] * (1 - args.threshold):
+                regressions.append(
+                    f"{phase} {route}: throughput {before['throughput_rps']:.1f} -> {stats['throughput_rps']:.1f} rps"
+                )
+
+    print(json.dumps({"warnings": warnings, "regressions": regressions}, indent=2))
+    return 1 if regressions else 0
+
+
+def startup(args):
+    scale = dict(SCALES[args.scale])
+    path = os.path.join(tempfile.mkdtemp(prefix="food-bench-"), "bench.db")
+    seed(path, scale["users"], scale["donations"], scale["requests"], args.seed)
+    boots = []
+    for _ in range(args.repeat):
+        with APIServer(path, workers=args.workers) as server:
+            boots.append({"live_seconds": server.startup_seconds, "ready_seconds": server.ready_seconds,
+                          "rss_mb": server.rss() / 2**20})
+        print(json.dumps(boots[-1]), file=sys.stderr)
+    ready = sorted(b["ready_seconds"] for b in boots)
+    report = {
+        "config": {"scale": args.scale, **scale, "workers": args.workers, "repeat": args.repeat},
+        "boots": boots,
+        "ready_p50_seconds": percentile(ready, 50),
+        "ready_max_seconds": ready[-1],
+    }
+    print(json.dumps(report, indent=2))
+    return 0
+
+
+def micro(args):
+    names = args.only or list(BENCHMARKS)
+    report = {}
+    for name in names:
+        report[name] = BENCHMARKS[name]()
+        print(f"{name}: {json.dumps(report[name])}", file=sys.stderr)
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0
+
+
+def postgrest(args):
+    report = {
+        "config": {k: v for k, v in vars(args).items() if k != "func"},
+        "results": bench_postgrest(args.concurrency, args.pool_size, args.calls, args.latency_ms / 1000),
+    }
+    output = json.dumps(report, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output)
+    else:
+        print(output)
+    return 1 if any(r["errors"] for r in report["results"].values()) else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="seed, boot the API and drive the routes")
+    run_parser.add_argument("--scale", choices=SCALES, default="small")
+    run_parser.add_argument("--users", type=int)
+    run_parser.add_argument("--donations", type=int)
+    run_parser.add_argument("--requests", type=int)
+    run_parser.add_argument("--seed", type=int, default=42)
+    run_parser.add_argument("--mode", choices=["closed", "open"], default="closed")
+    run_parser.add_argument("--concurrency", type=int, default=32, help="closed-loop workers")
+    run_parser.add_argument("--rps", type=float, default=200, help="open-loop arrival rate")
+    run_parser.add_argument("--duration", type=float, default=10, help="seconds per phase")
+    run_parser.add_argument("--workers", type=int, default=1, help="uvicorn workers")
+    run_parser.add_argument("--sqlite-path")
+    run_parser.add_argument("--out")
+    run_parser.set_defaults(func=run)
+
+    compare_parser = commands.add_parser("compare", help="flag regressions against a saved baseline")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("--threshold", type=float, default=0.10)
+    compare_parser.set_defaults(func=compare)
+
+    micro_parser = commands.add_parser("micro", help="in-process component benchmarks")
+    micro_parser.add_argument("--only", nargs="*", choices=BENCHMARKS)
+    micro_parser.add_argument("--out")
+    micro_parser.set_defaults(func=micro)
+
+    startup_parser = commands.add_parser("startup", help="time to live and ready across repeated boots")
+    startup_parser.add_argument("--scale", choices=SCALES, default="small")
+    startup_parser.add_argument("--seed", type=int, default=42)
+    startup_parser.add_argument("--workers", type=int, default=1)
+    startup_parser.add_argument("--repeat", type=int, default=3)
+    startup_parser.set_defaults(func=startup)
+
+    postgrest_parser = commands.add_parser("postgrest", help="Supabase client under load against a stub PostgREST")
+    postgrest_parser.add_argument("--concurrency", type=int, nargs="*", default=[1, 10, 100, 500], help="calls in flight")
+    postgrest_parser.add_argument("--pool-size", type=int, nargs="*", default=[10, 100])
+    postgrest_parser.add_argument("--calls", type=int, default=2000, help="calls per configuration")
+    postgrest_parser.add_argument("--latency-ms", type=float, default=2.0, help="stub server delay per request")
+    postgrest_parser.add_argument("--out")
+    postgrest_parser.set_defaults(func=postgrest)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
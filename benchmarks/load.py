@@ -0,0 +1,170 @@
+import asyncio
+import random
+import time
+from datetime import date, timedelta
+import httpx
+
+# Relative weights of the operations in the realistic mix
+MIX = {"donor_post": 2, "ngo_browse": 5, "ngo_requests": 2, "request_create": 1, "status_change": 1}
+
+
+class Workload:
+    """
+    Builds requests for the existing routes against a seeded dataset
+    """
+    def __init__(self, users, donations, seed=7):
+        self.rng = random.Random(seed)
+        self.donors = [i for i in range(1, users + 1) if i % 2]
+        self.ngos = [i for i in range(1, users + 1) if not i % 2]
+        self.donations = donations
+
+    def donor_post(self):
+        return "POST /donations", "POST", "/donations", {"json": {
+            "user_id": self.rng.choice(self.donors),
+            "food_item": self.rng.choice(["rice", "bread", "biryani", "dal"]),
+            "quantity": self.rng.randint(1, 50),
+            "expiry_date": (date.today() + timedelta(days=self.rng.randint(1, 7))).isoformat(),
+        }}
+
+    def ngo_browse(self):
+        return "GET /donations", "GET", "/donations", {"params": {"limit": 100}}
+
+    def ngo_requests(self):
+        return "GET /requests/{ngo_id}", "GET", f"/requests/{self.rng.choice(self.ngos)}", {}
+
+    def request_create(self):
+        return "POST /requests", "POST", "/requests", {"json": {
+            "donation_id": self.rng.randint(1, self.donations),
+            "ngo_email": f"user{self.rng.choice(self.ngos)}@example.org",
+        }}
+
+    def status_change(self):
+        donation_id = self.rng.randint(1, self.donations)
+        status = self.rng.choice(["available", "accepted"])
+        return ("PUT /donations/{donation_id}/status", "PUT", f"/donations/{donation_id}/status",
+                {"params": {"status": status}})
+
+    def picker(self, operations):
+        names = list(operations)
+        weights = [operations[n] for n in names]
+        return lambda: getattr(self, self.rng.choices(names, weights)[0])()
+
+
+class Recorder:
+    """
+    Latencies of successful (2xx/3xx) responses per route. Client errors
+    (4xx, e.g. a 409 for a donation already claimed) are counted as
+    rejected and server errors or failed connections as errors; neither
+    counts towards latency or throughput, so fast refusals cannot flatter
+    a route.
+    """
+    def __init__(self):
+        self.latencies = {}
+        self.rejected = {}
+        self.errors = {}
+
+    def record(self, route, seconds, status):
+        self.latencies.setdefault(route, [])
+        if status is None or status >= 500:
+            self.errors[route] = self.errors.get(route, 0) + 1
+        elif status >= 400:
+            self.rejected[route] = self.rejected.get(route, 0) + 1
+        else:
+            self.latencies[route].append(seconds)
+
+    def summary(self, duration):
+        report = {}
+        for route, values in self.latencies.items():
+            values.sort()
+            report[route] = {
+                "requests": len(values),
+                "rejected": self.rejected.get(route, 0),
+                "errors": self.errors.get(route, 0),
+                "throughput_rps": len(values) / duration,
+                "p50_ms": percentile(values, 50) * 1000,
+                "p95_ms": percentile(values, 95) * 1000,
+                "p99_ms": percentile(values, 99) * 1000,
+            }
+        return report
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    index = min(len(values) - 1, max(0, round(pct / 100 * len(values)) - 1))
+    return values[index]
+
+
+async def send(client, recorder, request, scheduled=None):
+    route, method, path, kwargs = request
+    start = scheduled if scheduled is not None else time.perf_counter()
+    try:
+        status = (await client.request(method, path, **kwargs)).status_code
+    except httpx.HTTPError:
+        status = None
+    recorder.record(route, time.perf_counter() - start, status)
+
+
+async def closed_loop(client, pick, concurrency, duration):
+    """
+    concurrency workers each send their next request as soon as the last returns
+    """
+    recorder = Recorder()
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        while time.perf_counter() < deadline:
+            await send(client, recorder, pick())
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return recorder
+
+
+async def open_loop(client, pick, rps, duration):
+    """
+    Requests arrive at a fixed rate regardless of response times; latency is
+    measured from the scheduled arrival so queueing delay is not hidden
+    """
+    recorder = Recorder()
+    start = time.perf_counter()
+    tasks = []
+    for i in range(int(rps * duration)):
+        scheduled = start + i / rps
+        delay = scheduled - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.create_task(send(client, recorder, pick(), scheduled)))
+    await asyncio.gather(*tasks)
+    return recorder
+
+
+async def sample_rss(server, samples, interval=0.1):
+    while True:
+        samples.append(server.rss())
+        await asyncio.sleep(interval)
+
+
+async def run_phase(server, operations, workload, mode, concurrency, rps, duration):
+    """
+    Drive one phase and report per-route latency, throughput and server memory
+    """
+    pick = workload.picker(operations)
+    limits = httpx.Limits(max_connections=max(concurrency, 100), max_keepalive_connections=max(concurrency, 100))
+    async with httpx.AsyncClient(base_url=server.url, limits=limits, timeout=30.0) as client:
+        baseline = server.rss()
+        samples = []
+        sampler = asyncio.create_task(sample_rss(server, samples))
+        started = time.perf_counter()
+        if mode == "open":
+            recorder = await open_loop(client, pick, rps, duration)
+        else:
+            recorder = await closed_loop(client, pick, concurrency, duration)
+        elapsed = time.perf_counter() - started
+        sampler.cancel()
+    peak = max(samples or [baseline])
+    return {
+        "seconds": elapsed,
+        "routes": recorder.summary(elapsed),
+        "rss_peak_mb": peak / 2**20,
+        "rss_growth_mb": (peak - baseline) / 2**20,
+    }
@@ -0,0 +1,346 @@
+"""
+In-process micro-benchmarks for the in-memory components. They need no
+server or database: backends are small in-memory fakes or a temporary,
+seeded SQLite file.
+"""
+import asyncio
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+from src.db import QueryResponse
+from src.events import ChangeFeed
+from concurrent.futures import ThreadPoolExecutor
+from src.logic import DonationManager, RequestManager, SingleFlight, TTLCache, UserManager
+from src.sqlite_db import SQLiteDatabaseManager
+from src.matching import MatchingEngine
+from src.search import SearchIndex
+from benchmarks.load import percentile
+from benchmarks.seed import FOODS, seed
+
+
+def bench_request_creation(sizes=(100, 1_000, 10_000, 100_000), creates=500):
+    """
+    Latency of POST /requests' work, resolving the NGO's email and
+    claiming a donation, against a seeded SQLite database as the user table
+    grows. "cold" resolves each email for the first time, "warm" resolves
+    them again from the directory, and "after_user_write" follows every
+    claim with a write to another user, which invalidates the directory.
+    """
+    results = {}
+    for size in sizes:
+        path = os.path.join(tempfile.mkdtemp(prefix="food-requests-"), "requests.db")
+        seed(path, size, 3 * creates, 0)
+        with sqlite3.connect(path) as conn:
+            conn.execute("UPDATE donations SET status = 'available'")
+        rng = random.Random(1)
+        emails = [f"user{i}@example.org" for i in rng.choices(range(2, size + 1, 2), k=creates)]
+        donor_ids = range(1, size + 1, 2)
+
+        async def create():
+            db = SQLiteDatabaseManager(path)
+            await db.open()
+            donations = DonationManager(db, cache=TTLCache(ttl=0))
+            requests = RequestManager(db, donations=donations)
+            users = UserManager(db, donations=donations, requests=requests)
+            donation_ids = iter(range(1, 3 * creates + 1))
+            phases = {}
+            for phase in ("cold", "warm", "after_user_write"):
+                latencies = []
+                for email in emails:
+                    sent = time.perf_counter()
+                    ngo = await users.find_user(email, role="ngo")
+                    result = await requests.create_request(ngo[0], next(donation_ids))
+                    latencies.append((time.perf_counter() - sent) * 1000)
+                    assert result["Success"], result
+                    if phase == "after_user_write":
+                        await users.update_user(rng.choice(donor_ids), name=f"donor{rng.random()}")
+                latencies.sort()
+                phases[f"{phase}_p50_ms"] = percentile(latencies, 50)
+                phases[f"{phase}_p99_ms"] = percentile(latencies, 99)
+            await db.close()
+            return phases
+
+        results[size] = asyncio.run(create())
+    return results
+
+
+def bench_matching(sizes=(1_000, 10_000, 100_000, 1_000_000), ngos=1_000, per_ngo=10):
+    """
+    Top-k latency and batch assignment throughput against open donations
+    """
+    rng = random.Random(2)
+    today = date.today()
+    results = {}
+    for size in sizes:
+        donations = [{
+            "donation_id": i,
+            "quantity": rng.randint(1, 50),
+            "expiry_date": (today + timedelta(days=rng.randint(0, 30))).isoformat(),
+            "status": "available",
+        } for i in range(1, size + 1)]
+        engine = MatchingEngine(None, None)
+        start = time.perf_counter()
+        engine.add_many(donations)
+        load = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for _ in range(1_000):
+            engine.top(10)
+        top_k = (time.perf_counter() - start) / 1_000
+
+        for ngo_id in range(ngos):
+            engine.add_demand(ngo_id, per_ngo)
+        start = time.perf_counter()
+        assigned = len(engine.assign())
+        assign = time.perf_counter() - start
+        results[size] = {
+            "load_seconds": load,
+            "top10_us": top_k * 1e6,
+            "assigned": assigned,
+            "assignments_per_second": assigned / assign if assign else 0.0,
+        }
+    return results
+
+
+def bench_change_feed(subscribers=1_000, events=100):
+    """
+    Fan-out of change events to many SSE subscribers from one task
+    """
+    async def fan_out():
+        feed = ChangeFeed(buffer_size=events + 1)
+        feed.start()
+        queues = [feed.subscribe() for _ in range(subscribers)]
+        for queue in queues:
+            queue.get_nowait()
+        start = time.perf_counter()
+        for i in range(events):
+            feed.on_change("insert", [{"donation_id": i}])
+        while feed.inbox.qsize():
+            await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        elapsed = time.perf_counter() - start
+        delivered = sum(queue.qsize() for queue in queues)
+        await feed.stop()
+        return {"subscribers": subscribers, "events": events, "delivered": delivered,
+                "fan_out_tasks": 1, "deliveries_per_second": delivered / elapsed}
+
+    return asyncio.run(fan_out())
+
+
+def bench_search(sizes=(1_000, 10_000, 100_000), queries=("rice", "bri", "biriyani", "curd rice", "sandwich", "milk"),
+                 repeat=500):
+    """
+    Query latency of the food-item search index as live donations grow
+    """
+    rng = random.Random(3)
+    today = date.today()
+    results = {}
+    for size in sizes:
+        index = SearchIndex(None)
+        index.add_many([{
+            "donation_id": i,
+            "food_item": rng.choice(FOODS),
+            "expiry_date": (today + timedelta(days=rng.randint(0, 30))).isoformat(),
+            "status": "available",
+        } for i in range(1, size + 1)])
+        per_query = {}
+        for query in queries:
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                index.search(query, 20)
+                timings.append(time.perf_counter() - start)
+            timings.sort()
+            per_query[query] = {"p50_us": percentile(timings, 50) * 1e6, "p99_us": percentile(timings, 99) * 1e6}
+        results[size] = per_query
+    return results
+
+
+class SlowDonations:
+    """
+    Backend stand-in that counts queries and takes latency seconds each
+    """
+    def __init__(self, latency=0.005):
+        self.latency = latency
+        self.queries = 0
+
+    async def get_available_donations(self, limit=None, after=None):
+        self.queries += 1
+        await asyncio.sleep(self.latency)
+        return QueryResponse([{"donation_id": 1, "status": "available"}])
+
+    def get_available_donations_sync(self):
+        self.queries += 1
+        time.sleep(self.latency)
+        return [{"donation_id": 1, "status": "available"}]
+
+
+def bench_singleflight(clients=(1, 10, 100, 1_000), rounds=5):
+    """
+    Backend queries per refresh storm of identical GET /donations reads,
+    with the response cache disabled so every read is a miss
+    """
+    results = {}
+    for count in clients:
+        async def storm():
+            db = SlowDonations()
+            manager = DonationManager(db, cache=TTLCache(ttl=0))
+            start = time.perf_counter()
+            for _ in range(rounds):
+                await asyncio.gather(*(manager.get_available_donations() for _ in range(count)))
+            elapsed = time.perf_counter() - start
+            return db.queries, manager.flight.stats(), elapsed
+
+        queries, stats, elapsed = asyncio.run(storm())
+
+        db, flight = SlowDonations(), SingleFlight()
+        with ThreadPoolExecutor(max_workers=min(count, 64)) as pool:
+            for _ in range(rounds):
+                list(pool.map(lambda _: flight.do_sync("donations", db.get_available_donations_sync), range(count)))
+        results[count] = {
+            "async_backend_queries": queries,
+            "async_collapsed": stats["collapsed"],
+            "async_storm_ms": elapsed / rounds * 1000,
+            "threaded_backend_queries": db.queries,
+            "threaded_collapsed": flight.collapsed,
+        }
+    return results
+
+
+def bench_claim(threads=(2, 8, 32), donations=200):
+    """
+    Threads, each with its own SQLite connection, race to claim the same
+    donation round after round; every round must have exactly one winner
+    """
+    results = {}
+    for count in threads:
+        path = os.path.join(tempfile.mkdtemp(prefix="food-claim-"), "claim.db")
+        seed(path, count * 2, donations, 0)
+        with sqlite3.connect(path) as conn:
+            conn.execute("UPDATE donations SET status = 'available'")
+        barrier = threading.Barrier(count)
+        wins = [[] for _ in range(count)]
+        conflicts = [0] * count
+        rounds = []
+
+        def worker(n):
+            async def race():
+                db = SQLiteDatabaseManager(path)
+                await db.open()
+                requests = RequestManager(db, donations=DonationManager(db))
+                for donation_id in range(1, donations + 1):
+                    if barrier.wait() == 0:
+                        rounds.append(time.perf_counter())
+                    result = await requests.create_request(2 * (n + 1), donation_id)
+                    if result["Success"]:
+                        wins[n].append(donation_id)
+                    elif result.get("Conflict"):
+                        conflicts[n] += 1
+                await db.close()
+            asyncio.run(race())
+
+        start = time.perf_counter()
+        workers = [threading.Thread(target=worker, args=(n,)) for n in range(count)]
+        for t in workers:
+            t.start()
+        for t in workers:
+            t.join()
+        elapsed = time.perf_counter() - start
+
+        won = sorted(d for w in wins for d in w)
+        round_ms = sorted((b - a) * 1000 for a, b in zip(rounds, rounds[1:]))
+        results[count] = {
+            "rounds": donations,
+            "exactly_one_winner": won == list(range(1, donations + 1)),
+            "conflicts": sum(conflicts),
+            "claims_per_second": count * donations / elapsed,
+            "round_p50_ms": percentile(round_ms, 50),
+            "round_p99_ms": percentile(round_ms, 99),
+        }
+    return results
+
+
+class StubInserts:
+    """
+    Insert-only backend stand-in with a pool of connections: every round
+    trip holds one for latency seconds plus per_row seconds per row written
+    """
+    def __init__(self, connections=10, latency=0.002, per_row=0.00002):
+        self.pool = asyncio.Semaphore(connections)
+        self.latency = latency
+        self.per_row = per_row
+        self.round_trips = 0
+        self.next_id = 0
+
+    async def create_donations(self, rows):
+        async with self.pool:
+            self.round_trips += 1
+            await asyncio.sleep(self.latency + self.per_row * len(rows))
+        inserted = []
+        for row in rows:
+            self.next_id += 1
+            inserted.append({"donation_id": self.next_id, "status": "available", **row})
+        return QueryResponse(inserted)
+
+    async def create_donation(self, user_id, food_item, quantity, expiry_date):
+        return await self.create_donations([{
+            "user_id": user_id, "food_item": food_item, "quantity": quantity, "expiry_date": expiry_date,
+        }])
+
+
+def bench_write_behind(producers=(1, 10, 100, 1_000), inserts=5_000):
+    """
+    Sustained POST /donations insert throughput with concurrent producers,
+    writing row by row and through the write-behind queue
+    """
+    results = {}
+    for count in producers:
+        row = {}
+        for mode in ("direct", "write_behind"):
+            async def produce():
+                db = StubInserts()
+                manager = DonationManager(db)
+                queue = manager.enable_write_behind() if mode == "write_behind" else None
+                if queue is not None:
+                    queue.start()
+                latencies = []
+
+                async def producer(n):
+                    for i in range(n, inserts, count):
+                        sent = time.perf_counter()
+                        result = await manager.add_donation(i % 100, "rice", 1, "2030-01-01")
+                        assert result["Success"]
+                        latencies.append((time.perf_counter() - sent) * 1000)
+
+                start = time.perf_counter()
+                await asyncio.gather(*(producer(n) for n in range(count)))
+                elapsed = time.perf_counter() - start
+                if queue is not None:
+                    await queue.stop()
+                latencies.sort()
+                return {
+                    "inserts_per_second": inserts / elapsed,
+                    "round_trips": db.round_trips,
+                    "p50_ms": percentile(latencies, 50),
+                    "p99_ms": percentile(latencies, 99),
+                }
+
+            for key, value in asyncio.run(produce()).items():
+                row[f"{mode}_{key}"] = value
+        results[count] = row
+    return results
+
+
+BENCHMARKS = {
+    "request_creation": bench_request_creation,
+    "matching": bench_matching,
+    "change_feed": bench_change_feed,
+    "search": bench_search,
+    "singleflight": bench_singleflight,
+    "claim": bench_claim,
+    "write_behind": bench_write_behind,
+}
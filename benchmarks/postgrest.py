@@ -0,0 +1,248 @@
+"""
+Load benchmark of the Supabase backend (src/db.py's pooled PostgREST
+client) against a local stub PostgREST server, so the production query
+path runs with hundreds of calls in flight without a real Supabase.
+"""
+import asyncio
+import json
+import random
+import threading
+import time
+from datetime import date, timedelta
+import uvicorn
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+from src.db import SupabaseDatabaseManager
+from src.logic import DonationManager, RequestManager, TTLCache
+from benchmarks.load import percentile
+from benchmarks.seed import FOODS
+from benchmarks.server import free_port
+
+KEYS = {"users": "user_id", "donations": "donation_id", "requests": "request_id"}
+DEFAULTS = {"donations": {"status": "available"}, "requests": {"status": "pending"}}
+
+
+def parse_value(value):
+    try:
+        return int(value)
+    except ValueError:
+        return value
+
+
+def row_filter(column, spec):
+    op, _, value = spec.partition(".")
+    if op == "in":
+        values = {parse_value(v) for v in value.strip("()").split(",") if v}
+        return lambda row: row.get(column) in values
+    value = parse_value(value)
+    compare = {
+        "eq": lambda a: a == value,
+        "neq": lambda a: a != value,
+        "gt": lambda a: a is not None and a > value,
+        "gte": lambda a: a is not None and a >= value,
+        "lt": lambda a: a is not None and a < value,
+        "lte": lambda a: a is not None and a <= value,
+    }[op]
+    return lambda row: compare(row.get(column))
+
+
+class StubPostgREST:
+    """
+    In-memory PostgREST stand-in: filters, order, limit, insert, update and
+    delete on flat rows (embedded resources are not resolved). Every
+    request waits latency seconds, like a round trip to the database.
+    Conditional updates are atomic, as they are in Postgres.
+    """
+    def __init__(self, latency=0.002):
+        self.latency = latency
+        self.tables = {name: {} for name in KEYS}
+        self.next_id = {name: 0 for name in KEYS}
+        self.requests = 0
+        self.connections = set()
+        self.app = Starlette(routes=[
+            Route("/rest/v1/{table}", self.handle, methods=["GET", "POST", "PATCH", "DELETE"]),
+        ])
+
+    def insert(self, table, rows):
+        inserted = []
+        for row in rows:
+            self.next_id[table] += 1
+            row = {**DEFAULTS.get(table, {}), **row, KEYS[table]: self.next_id[table]}
+            self.tables[table][row[KEYS[table]]] = row
+            inserted.append(row)
+        return inserted
+
+    def candidates(self, table, key_specs):
+        # Rows are stored under dense serial keys in key order, so key
+        # filters become direct lookups instead of table scans
+        rows, key = self.tables[table], KEYS[table]
+        for spec in key_specs:
+            op, _, value = spec.partition(".")
+            if op == "eq":
+                return [rows[int(value)]] if int(value) in rows else []
+            if op == "in":
+                ids = sorted({int(v) for v in value.strip("()").split(",") if v})
+                return [rows[i] for i in ids if i in rows]
+            if op == "gt":
+                return (rows[i] for i in range(int(value) + 1, self.next_id[table] + 1) if i in rows)
+        return rows.values()
+
+    def select(self, table, params):
+        filters, key_specs, order, limit = [], [], None, None
+        for column, spec in params:
+            if column == "select":
+                continue
+            if column == "order":
+                order = spec.split(".")[0]
+            elif column == "limit":
+                limit = int(spec)
+            else:
+                filters.append(row_filter(column, spec))
+                if column == KEYS[table]:
+                    key_specs.append(spec)
+        matched = (row for row in self.candidates(table, key_specs) if all(f(row) for f in filters))
+        if order in (None, KEYS[table]):
+            # Already in key order: stop at limit
+            rows = []
+            for row in matched:
+                if limit is not None and len(rows) == limit:
+                    break
+                rows.append(row)
+            return rows
+        rows = sorted(matched, key=lambda row: row.get(order))
+        return rows[:limit] if limit is not None else rows
+
+    async def handle(self, request: Request):
+        self.requests += 1
+        self.connections.add(request.scope.get("client"))
+        table = request.path_params["table"]
+        if table not in KEYS:
+            return JSONResponse({"message": f"unknown table {table}"}, status_code=404)
+        await asyncio.sleep(self.latency)
+        params = list(request.query_params.multi_items())
+        if request.method == "POST":
+            body = await request.json()
+            rows = self.insert(table, body if isinstance(body, list) else [body])
+        elif request.method == "PATCH":
+            changes = await request.json()
+            rows = self.select(table, params)
+            for row in rows:
+                row.update(changes)
+        elif request.method == "DELETE":
+            rows = self.select(table, params)
+            for row in rows:
+                del self.tables[table][row[KEYS[table]]]
+        else:
+            rows = self.select(table, params)
+        return Response(json.dumps(rows), media_type="application/json")
+
+
+class StubServer:
+    """
+    Serves a StubPostgREST with uvicorn on a background thread
+    """
+    def __init__(self, stub):
+        self.stub = stub
+        self.port = free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.server = uvicorn.Server(uvicorn.Config(
+            stub.app, host="127.0.0.1", port=self.port, log_level="warning", backlog=4096,
+        ))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        while not self.server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc):
+        self.server.should_exit = True
+        self.thread.join()
+
+
+def seed_stub(stub, users, donations, seed=42):
+    rng = random.Random(seed)
+    stub.insert("users", [
+        {"name": f"user{i}", "email": f"user{i}@example.org", "password": "x", "role": "donor" if i % 2 else "ngo"}
+        for i in range(1, users + 1)
+    ])
+    stub.insert("donations", [
+        {"user_id": rng.randrange(1, users + 1, 2), "food_item": rng.choice(FOODS), "quantity": rng.randint(1, 50),
+         "expiry_date": (date.today() + timedelta(days=rng.randint(1, 30))).isoformat()}
+        for _ in range(donations)
+    ])
+
+
+async def drive(url, pool_size, concurrency, calls, users, donations, seed):
+    """
+    concurrency workers issue calls operations between them through the
+    production PostgREST client: reads straight from the backend, so a
+    failed call shows up as an error rather than an empty list, and writes
+    through the managers
+    """
+    db = SupabaseDatabaseManager(url=url, key="bench", pool_size=pool_size)
+    await db.open()
+    donation_manager = DonationManager(db, cache=TTLCache(ttl=0))
+    request_manager = RequestManager(db, donations=donation_manager)
+    rng = random.Random(seed)
+    operations = {
+        "get_available_donations": lambda: db.get_available_donations(50, rng.randrange(donations)),
+        "add_donation": lambda: donation_manager.add_donation(
+            rng.randrange(1, users + 1, 2), rng.choice(FOODS), 5, date.today().isoformat()),
+        "create_request": lambda: request_manager.create_request(
+            rng.randrange(2, users + 1, 2), rng.randrange(1, donations + 1)),
+        "get_requests_by_ngo": lambda: db.get_requests_by_ngo(rng.randrange(2, users + 1, 2), 50),
+    }
+    names = rng.choices(list(operations), weights=(6, 2, 1, 1), k=calls)
+    latencies = {name: [] for name in operations}
+    errors = 0
+
+    async def worker(n):
+        nonlocal errors
+        for name in names[n::concurrency]:
+            sent = time.perf_counter()
+            try:
+                result = await operations[name]()
+            except Exception:
+                errors += 1
+                continue
+            if getattr(result, "error", None) or isinstance(result, dict) and not (result["Success"] or result.get("Conflict")):
+                errors += 1
+                continue
+            latencies[name].append((time.perf_counter() - sent) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker(n) for n in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    await db.close()
+    every = sorted(ms for values in latencies.values() for ms in values)
+    return {
+        "calls_per_second": calls / elapsed,
+        "errors": errors,
+        "p50_ms": percentile(every, 50),
+        "p99_ms": percentile(every, 99),
+        "routes": {name: {"p50_ms": percentile(sorted(ms), 50), "p99_ms": percentile(sorted(ms), 99)}
+                   for name, ms in latencies.items()},
+    }
+
+
+def bench_postgrest(concurrency=(1, 10, 100, 500), pool_sizes=(10, 100), calls=2_000,
+                    latency=0.002, users=1_000, donations=10_000, seed=42):
+    """
+    Throughput, latency, errors and server-side connections opened per
+    (pool size, calls in flight)
+    """
+    results = {}
+    for pool_size in pool_sizes:
+        for count in concurrency:
+            stub = StubPostgREST(latency)
+            seed_stub(stub, users, donations, seed)
+            with StubServer(stub) as server:
+                result = asyncio.run(drive(server.url, pool_size, count, calls, users, donations, seed))
+            result["connections_opened"] = len(stub.connections)
+            result["server_requests"] = stub.requests
+            results[f"pool{pool_size}_inflight{count}"] = result
+    return results
@@ -0,0 +1,66 @@
+import asyncio
+import os
+import random
+from datetime import date, timedelta
+from src.sqlite_db import SQLiteDatabaseManager
+
+SCALES = {
+    "small": {"users": 100, "donations": 1_000, "requests": 500},
+    "medium": {"users": 1_000, "donations": 10_000, "requests": 5_000},
+    "large": {"users": 10_000, "donations": 100_000, "requests": 50_000},
+}
+
+FOODS = ["rice", "bread", "biryani", "dal", "chapati", "idli", "sambar", "curd rice",
+         "vegetable curry", "fruit salad", "sandwiches", "pulao", "upma", "poha", "milk"]
+
+
+def generate(users, donations, requests, seed=42):
+    """
+    Deterministic synthetic users, donations and requests.
+    Half the users are donors and half NGOs.
+    """
+    rng = random.Random(seed)
+    today = date.today()
+    user_rows = [
+        (f"user{i}", f"user{i}@example.org", "secret", "donor" if i % 2 else "ngo")
+        for i in range(1, users + 1)
+    ]
+    donors = [i for i in range(1, users + 1) if i % 2]
+    ngos = [i for i in range(1, users + 1) if not i % 2]
+    donation_rows = [
+        (rng.choice(donors), rng.choice(FOODS), str(rng.randint(1, 50)),
+         (today + timedelta(days=rng.randint(1, 14))).isoformat(),
+         rng.choices(["available", "accepted", "distributed"], weights=[8, 1, 1])[0])
+        for _ in range(donations)
+    ]
+    request_rows = [
+        (rng.choice(ngos), rng.randint(1, donations), rng.choice(["pending", "accepted", "rejected"]))
+        for _ in range(requests)
+    ]
+    return user_rows, donation_rows, request_rows
+
+
+async def seed_sqlite(path, users, donations, requests, seed=42):
+    """
+    Create a fresh SQLite database at path and fill it with generate()
+    """
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    db = SQLiteDatabaseManager(path)
+    await db.open()
+    user_rows, donation_rows, request_rows = generate(users, donations, requests, seed)
+    conn = db.conn
+    conn.execute("BEGIN")
+    conn.executemany("INSERT INTO users (name, email, password, role) VALUES (?, ?, ?, ?)", user_rows)
+    conn.executemany(
+        "INSERT INTO donations (user_id, food_item, quantity, expiry_date, status) VALUES (?, ?, ?, ?, ?)",
+        donation_rows,
+    )
+    conn.executemany("INSERT INTO requests (ngo_id, donation_id, status) VALUES (?, ?, ?)", request_rows)
+    conn.execute("COMMIT")
+    await db.close()
+
+
+def seed(path, users, donations, requests, seed=42):
+    asyncio.run(seed_sqlite(path, users, donations, requests, seed))
@@ -0,0 +1,104 @@
+import os
+import socket
+import subprocess
+import sys
+import time
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def process_tree(pid):
+    pids = [pid]
+    try:
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                for child in f.read().split():
+                    pids += process_tree(int(child))
+    except OSError:
+        pass
+    return pids
+
+
+def rss_bytes(pid):
+    """
+    Resident memory of a process and its children (Linux only, else 0)
+    """
+    total = 0
+    for p in process_tree(pid):
+        try:
+            with open(f"/proc/{p}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total += int(line.split()[1]) * 1024
+        except OSError:
+            pass
+    return total
+
+
+class APIServer:
+    """
+    Runs API/main.py under uvicorn in a subprocess against a SQLite file
+    """
+    def __init__(self, sqlite_path, workers=1, env=None):
+        self.sqlite_path = sqlite_path
+        self.workers = workers
+        self.env = env or {}
+        self.port = free_port()
+        self.url = f"http://127.0.0.1:{self.port}"
+        self.process = None
+        self.startup_seconds = None
+        self.ready_seconds = None
+
+    def start(self, timeout=60.0):
+        env = dict(os.environ, DB_BACKEND="sqlite", SQLITE_PATH=self.sqlite_path, **self.env)
+        started = time.perf_counter()
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", os.path.join(ROOT, "API"),
+             "--port", str(self.port), "--workers", str(self.workers), "--log-level", "warning"],
+            cwd=ROOT, env=env,
+        )
+        deadline = started + timeout
+        self.startup_seconds = self._wait_for("/healthz", started, deadline)
+        # Several workers answer on one port: require every one to be ready
+        self.ready_seconds = self._wait_for("/readyz", started, deadline, in_a_row=self.workers)
+        return self
+
+    def _wait_for(self, path, started, deadline, in_a_row=1):
+        successes = 0
+        while time.perf_counter() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError("API server exited during startup")
+            try:
+                successes = successes + 1 if httpx.get(self.url + path, timeout=1.0).status_code == 200 else 0
+            except httpx.HTTPError:
+                successes = 0
+            if successes >= in_a_row:
+                return time.perf_counter() - started
+            time.sleep(0.02 if successes else 0.05)
+        self.stop()
+        raise RuntimeError(f"API server did not answer {path} in time")
+
+    def rss(self):
+        return rss_bytes(self.process.pid) if self.process else 0
+
+    def stop(self):
+        if self.process is not None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+            self.process = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -1,83 +1,442 @@
+import asyncio
 import os
-from supabase import create_client
+from abc import ABC, abstractmethod
+import httpx
 from dotenv import load_dotenv
 
-load_dotenv()
-url = os.getenv("SUPABASE_URL")
-key = os.getenv("SUPABASE_KEY")
-supabase = create_client(url, key)
+def created_between(query, since=None, until=None):
+    """
+    Restrict created_at to [since, until), both ISO dates or timestamps
+    """
+    if since is not None:
+        query = query.gte("created_at", since)
+    if until is not None:
+        query = query.lt("created_at", until)
+    return query
 
-class DatabaseManager:
-    def __init__(self):
-        self.client = supabase
+
+def paginate(query, key, limit=None, after=None):
+    """
+    Apply keyset pagination on a serial primary key
+    """
+    query = query.order(key)
+    if after is not None:
+        query = query.gt(key, after)
+    if limit is not None:
+        query = query.limit(limit)
+    return query
+
+
+class QueryResponse:
+    """
+    Minimal stand-in for PostgrestResponse (data + error)
+    """
+    def __init__(self, data=None, error=None):
+        self.data = data if data is not None else []
+        self.error = error
+
+
+class AsyncQuery:
+    """
+    Async PostgREST request builder mirroring the supabase query API
+    """
+    def __init__(self, http, table):
+        self.http = http
+        self.table = table
+        self.method = "GET"
+        self.payload = None
+        self.params = []
+
+    def select(self, columns="*"):
+        self.params.append(("select", columns))
+        return self
+
+    def insert(self, data):
+        self.method, self.payload = "POST", data
+        return self
+
+    def update(self, data):
+        self.method, self.payload = "PATCH", data
+        return self
+
+    def delete(self):
+        self.method = "DELETE"
+        return self
+
+    def _filter(self, column, op, value):
+        self.params.append((column, f"{op}.{value}"))
+        return self
+
+    def eq(self, column, value):
+        return self._filter(column, "eq", value)
+
+    def neq(self, column, value):
+        return self._filter(column, "neq", value)
+
+    def gt(self, column, value):
+        return self._filter(column, "gt", value)
+
+    def gte(self, column, value):
+        return self._filter(column, "gte", value)
+
+    def lt(self, column, value):
+        return self._filter(column, "lt", value)
+
+    def lte(self, column, value):
+        return self._filter(column, "lte", value)
+
+    def in_(self, column, values):
+        return self._filter(column, "in", "(" + ",".join(str(v) for v in values) + ")")
+
+    def order(self, column, desc=False):
+        self.params.append(("order", f"{column}.{'desc' if desc else 'asc'}"))
+        return self
+
+    def limit(self, count):
+        self.params.append(("limit", str(count)))
+        return self
+
+    async def execute(self):
+        try:
+            response = await self.http.request(
+                self.method, f"/{self.table}", params=self.params, json=self.payload,
+                headers={"Prefer": "return=representation"},
+            )
+        except httpx.HTTPError as e:
+            return QueryResponse(error=e)
+        if response.status_code >= 400:
+            return QueryResponse(error=response.text)
+        return QueryResponse(response.json() if response.content else [])
+
+
+class AsyncRestClient:
+    def __init__(self, http):
+        self.http = http
+
+    def table(self, name):
+        return AsyncQuery(self.http, name)
+
+
+class DatabaseManager(ABC):
+    """
+    Storage interface used by the managers. Every method is a coroutine
+    returning a response with .data (list of rows) and .error.
+    """
+    async def open(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def warm_up(self, connections=1):
+        """
+        Make the first real queries fast, e.g. by pre-opening pooled connections
+        """
+        pass
+
+    # ---- Users ----
+    @abstractmethod
+    async def create_user(self, name, email, password, role):
+        ...
+
+    @abstractmethod
+    async def get_all_users(self, limit=None, after=None):
+        ...
+
+    @abstractmethod
+    async def get_user_by_email(self, email):
+        ...
+
+    @abstractmethod
+    async def get_user_by_id(self, user_id):
+        ...
+
+    @abstractmethod
+    async def update_user(self, user_id, name=None, email=None, password=None, role=None):
+        ...
+
+    @abstractmethod
+    async def delete_user(self, user_id):
+        ...
+
+    # ---- Donations ----
+    @abstractmethod
+    async def create_donation(self, user_id, food_item, quantity, expiry_date):
+        ...
+
+    @abstractmethod
+    async def create_donations(self, rows):
+        ...
+
+    @abstractmethod
+    async def get_available_donations(self, limit=None, after=None):
+        ...
+
+    @abstractmethod
+    async def get_donations_by_user(self, user_id):
+        ...
+
+    @abstractmethod
+    async def get_all_donations(self, limit=None, after=None, since=None, until=None):
+        ...
+
+    @abstractmethod
+    async def update_donation_status(self, donation_id, status, unless=None):
+        """
+        Set a donation's status, leaving it alone if its status is unless
+        """
+        ...
+
+    @abstractmethod
+    async def update_donation_statuses(self, donation_ids, status, unless=None):
+        """
+        Set the status of the given donations, except those whose status
+        is unless; returns only the rows changed
+        """
+        ...
+
+    @abstractmethod
+    async def transition_donation_statuses(self, donation_ids, from_status, to_status):
+        """
+        Atomically move the given donations from from_status to to_status,
+        returning only the rows that were in from_status
+        """
+        ...
+
+    @abstractmethod
+    async def delete_donation(self, donation_id):
+        ...
+
+    # ---- Requests ----
+    @abstractmethod
+    async def create_request(self, ngo_id, donation_id):
+        ...
+
+    @abstractmethod
+    async def create_requests(self, rows):
+        ...
+
+    @abstractmethod
+    async def get_requests_by_status(self, status, limit=None, after=None):
+        ...
+
+    @abstractmethod
+    async def get_requests_by_ngo(self, ngo_id, limit=None, after=None):
+        ...
+
+    @abstractmethod
+    async def get_all_requests(self, limit=None, after=None):
+        ...
+
+    @abstractmethod
+    async def get_requests_with_donation_info_by_ngo(self, ngo_id):
+        ...
+
+    @abstractmethod
+    async def get_requests_by_donor(self, user_id):
+        ...
+
+    @abstractmethod
+    async def update_request_status(self, request_id, status):
+        ...
+
+    @abstractmethod
+    async def update_request_statuses(self, request_ids, status):
+        ...
+
+    @abstractmethod
+    async def delete_request(self, request_id):
+        ...
+
+    @abstractmethod
+    async def get_request_status_by_donation(self, donation_id):
+        ...
+
+    @abstractmethod
+    async def get_all_requests_with_user_info(self, limit=None, after=None, since=None, until=None):
+        ...
+
+
+class SupabaseDatabaseManager(DatabaseManager):
+    """
+    Supabase (PostgREST) backend over a pooled, keep-alive async HTTP client
+    """
+    def __init__(self, url=None, key=None, pool_size=None):
+        self.url = url or os.getenv("SUPABASE_URL")
+        self.key = key or os.getenv("SUPABASE_KEY")
+        self.pool_size = pool_size or int(os.getenv("DB_POOL_SIZE", "100"))
+        self.http = None
+        self.client = None
+
+    async def open(self):
+        if self.http is not None:
+            return
+        self.http = httpx.AsyncClient(
+            base_url=f"{self.url}/rest/v1",
+            headers={"apikey": self.key, "Authorization": f"Bearer {self.key}"},
+            limits=httpx.Limits(max_connections=self.pool_size, max_keepalive_connections=self.pool_size),
+            timeout=httpx.Timeout(10.0),
+        )
+        self.client = AsyncRestClient(self.http)
+
+    async def warm_up(self, connections=1):
+        # Concurrent trivial reads leave that many keep-alive connections
+        # (TLS handshakes done) in the pool
+        connections = max(1, min(connections, self.pool_size))
+        await asyncio.gather(*(
+            self.client.table("users").select("user_id").limit(1).execute() for _ in range(connections)
+        ))
+
+    async def close(self):
+        if self.http is not None:
+            await self.http.aclose()
+        self.http = None
+        self.client = None
 
     # ---- Users ----
-    def create_user(self, name, email, password, role):
-        return self.client.table("users").insert({
+    async def create_user(self, name, email, password, role):
+        return await self.client.table("users").insert({
             "name": name,
             "email": email,
             "password": password,
             "role": role,
         }).execute()
 
-    def get_all_users(self):
-        return self.client.table("users").select("*").execute()
+    async def get_all_users(self, limit=None, after=None):
+        query = self.client.table("users").select("*")
+        return await paginate(query, "user_id", limit, after).execute()
+
+    async def get_user_by_email(self, email):
+        return await self.client.table("users").select("user_id, email, role").eq("email", email).limit(1).execute()
+
+    async def get_user_by_id(self, user_id):
+        return await self.client.table("users").select("user_id, email, role").eq("user_id", user_id).limit(1).execute()
 
-    def update_user(self, user_id, name=None, email=None, password=None, role=None):
+    async def update_user(self, user_id, name=None, email=None, password=None, role=None):
         update_data = {}
         if name: update_data["name"] = name
         if email: update_data["email"] = email
         if password: update_data["password"] = password
         if role: update_data["role"] = role
-        return self.client.table("users").update(update_data).eq("user_id", user_id).execute()
+        return await self.client.table("users").update(update_data).eq("user_id", user_id).execute()
 
-    def delete_user(self, user_id):
-        return self.client.table("users").delete().eq("user_id", user_id).execute()
+    async def delete_user(self, user_id):
+        return await self.client.table("users").delete().eq("user_id", user_id).execute()
 
     # ---- Donations ----
-    def create_donation(self, user_id, food_item, quantity, expiry_date):
-        return self.client.table("donations").insert({
+    async def create_donation(self, user_id, food_item, quantity, expiry_date):
+        return await self.client.table("donations").insert({
             "user_id": user_id,
             "food_item": food_item,
             "quantity": quantity,
             "expiry_date": expiry_date
         }).execute()
 
-    def get_available_donations(self):
-        return self.client.table("donations").select("*").eq("status", "available").execute()
+    async def create_donations(self, rows):
+        return await self.client.table("donations").insert(rows).execute()
+
+    async def get_available_donations(self, limit=None, after=None):
+        query = self.client.table("donations").select("*").eq("status", "available")
+        return await paginate(query, "donation_id", limit, after).execute()
+
+    async def get_donations_by_user(self, user_id):
+        return await self.client.table("donations").select("*").eq("user_id", user_id).order("donation_id").execute()
+
+    async def get_all_donations(self, limit=None, after=None, since=None, until=None):
+        query = created_between(self.client.table("donations").select("*"), since, until)
+        return await paginate(query, "donation_id", limit, after).execute()
+
+    async def update_donation_status(self, donation_id, status, unless=None):
+        query = self.client.table("donations").update({"status": status}).eq("donation_id", donation_id)
+        if unless:
+            query = query.neq("status", unless)
+        return await query.execute()
+
+    async def update_donation_statuses(self, donation_ids, status, unless=None):
+        query = self.client.table("donations").update({"status": status}).in_("donation_id", donation_ids)
+        if unless:
+            query = query.neq("status", unless)
+        return await query.execute()
 
-    def update_donation_status(self, donation_id, status):
-        return self.client.table("donations").update({"status": status}).eq("donation_id", donation_id).execute()
+    async def transition_donation_statuses(self, donation_ids, from_status, to_status):
+        return await self.client.table("donations").update({"status": to_status}) \
+            .in_("donation_id", donation_ids).eq("status", from_status).execute()
 
-    def delete_donation(self, donation_id):
-        return self.client.table("donations").delete().eq("donation_id", donation_id).execute()
+    async def delete_donation(self, donation_id):
+        return await self.client.table("donations").delete().eq("donation_id", donation_id).execute()
 
     # ---- Requests ----
-    def create_request(self, ngo_id, donation_id):
-        return self.client.table("requests").insert({
+    async def create_request(self, ngo_id, donation_id):
+        return await self.client.table("requests").insert({
             "ngo_id": ngo_id,
             "donation_id": donation_id,
             "status": "pending"
         }).execute()
 
-    def get_requests_by_ngo(self, ngo_id):
-        return self.client.table("requests").select("*").eq("ngo_id", ngo_id).execute()
+    async def create_requests(self, rows):
+        return await self.client.table("requests").insert([
+            {"ngo_id": ngo_id, "donation_id": donation_id, "status": "pending"}
+            for ngo_id, donation_id in rows
+        ]).execute()
+
+    async def get_requests_by_status(self, status, limit=None, after=None):
+        query = self.client.table("requests").select("request_id, ngo_id, donation_id, status").eq("status", status)
+        return await paginate(query, "request_id", limit, after).execute()
+
+    async def get_requests_by_ngo(self, ngo_id, limit=None, after=None):
+        query = self.client.table("requests").select("*").eq("ngo_id", ngo_id)
+        return await paginate(query, "request_id", limit, after).execute()
+
+    async def get_all_requests(self, limit=None, after=None):
+        query = self.client.table("requests").select("*")
+        return await paginate(query, "request_id", limit, after).execute()
+
+    async def get_requests_with_donation_info_by_ngo(self, ngo_id):
+        return await self.client.table("requests") \
+            .select("request_id, status, donation_id, donations(food_item, quantity, expiry_date, status)") \
+            .eq("ngo_id", ngo_id).order("request_id").execute()
+
+    async def get_requests_by_donor(self, user_id):
+        return await self.client.table("requests") \
+            .select("request_id, ngo_id, donation_id, status, donations!inner(user_id)") \
+            .eq("donations.user_id", user_id).order("request_id").execute()
+
+    async def update_request_status(self, request_id, status):
+        return await self.client.table("requests").update({"status": status}).eq("request_id", request_id).execute()
+
+    async def update_request_statuses(self, request_ids, status):
+        return await self.client.table("requests").update({"status": status}).in_("request_id", request_ids).execute()
+
+    async def delete_request(self, request_id):
+        return await self.client.table("requests").delete().eq("request_id", request_id).execute()
+
+    async def get_request_status_by_donation(self, donation_id):
+        return await self.client.table("requests").select("request_id, ngo_id, status").eq("donation_id", donation_id).execute()
 
-    def get_requests_with_donation_info_by_ngo(self, ngo_id):
-        return self.client.table("requests") \
-            .select("request_id, status, donation_id, donations(food_item, expiry_date)") \
-            .eq("ngo_id", ngo_id).execute()
+    async def get_all_requests_with_user_info(self, limit=None, after=None, since=None, until=None):
+        query = self.client.table("requests") \
+            .select("request_id, status, donation_id, ngo_id, created_at, ngo:users(name), donations(food_item)")
+        return await paginate(created_between(query, since, until), "request_id", limit, after).execute()
 
-    def update_request_status(self, request_id, status):
-        return self.client.table("requests").update({"status": status}).eq("request_id", request_id).execute()
 
-    def delete_request(self, request_id):
-        return self.client.table("requests").delete().eq("request_id", request_id).execute()
+_shared_manager = None
 
-    def get_request_status_by_donation(self, donation_id):
-        return self.client.table("requests").select("request_id, ngo_id, status").eq("donation_id", donation_id).execute()
 
-    def get_all_requests_with_user_info(self):
-        return self.client.table("requests") \
-            .select("request_id, status, donation_id, ngo:users(name), donations(food_item)") \
-            .execute()
+def get_database_manager():
+    """
+    The process-wide storage backend selected by DB_BACKEND (supabase or
+    sqlite), built on first use and shared by every manager. Building it
+    does no I/O; connections are made by open().
+    """
+    global _shared_manager
+    if _shared_manager is None:
+        load_dotenv()
+        backend = os.getenv("DB_BACKEND", "supabase").lower()
+        if backend == "sqlite":
+            from src.sqlite_db import SQLiteDatabaseManager
+            _shared_manager = SQLiteDatabaseManager(os.getenv("SQLITE_PATH", "food_donation.db"))
+        elif backend == "supabase":
+            _shared_manager = SupabaseDatabaseManager()
+        else:
+            raise ValueError(f"Unknown DB_BACKEND: {backend}")
+    return _shared_manager
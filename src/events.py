@@ -0,0 +1,104 @@
+import asyncio
+import json
+import time
+from collections import deque
+
+
+class ChangeFeed:
+    """
+    Fans DonationManager write events out to Server-Sent Events subscribers.
+
+    Publishing only enqueues; a single background task stamps each event with
+    an id, keeps it in a bounded history for resuming, and copies it into
+    every subscriber's bounded queue. Subscribers whose queue is full are
+    dropped and must reconnect with their last event id.
+    """
+    def __init__(self, buffer_size=100, history_size=1000):
+        self.buffer_size = buffer_size
+        self.history = deque(maxlen=history_size)
+        self.subscribers = set()
+        self.epoch = str(int(time.time()))
+        self.last_id = 0
+        self.inbox = None
+        self.task = None
+        self.published = 0
+        self.dropped = 0
+
+    def event_id(self, number):
+        return f"{self.epoch}-{number}"
+
+    def on_change(self, kind, rows):
+        if self.inbox is not None:
+            self.inbox.put_nowait((kind, rows))
+
+    # ---- Subscriptions ----
+    def subscribe(self, last_event_id=None):
+        """
+        Return a queue of (id, kind, rows) events. Events after
+        last_event_id are replayed first; if it is unknown or too old, a
+        "reset" event tells the client to refetch the full list.
+        """
+        queue = asyncio.Queue(maxsize=self.buffer_size + 1)
+        since = self.resume_point(last_event_id)
+        backlog = [event for event in self.history if since is not None and event[0] > since]
+        if since is None or len(backlog) > self.buffer_size:
+            queue.put_nowait((self.event_id(self.last_id), "reset", []))
+        else:
+            for number, kind, rows in backlog:
+                queue.put_nowait((self.event_id(number), kind, rows))
+        self.subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue):
+        self.subscribers.discard(queue)
+
+    def resume_point(self, last_event_id):
+        epoch, _, number = (last_event_id or "").partition("-")
+        if epoch != self.epoch or not number.isdigit():
+            return None
+        number = int(number)
+        oldest = self.history[0][0] if self.history else self.last_id + 1
+        if number > self.last_id or number < oldest - 1:
+            return None
+        return number
+
+    # ---- Fan-out ----
+    async def run(self):
+        while True:
+            kind, rows = await self.inbox.get()
+            self.last_id += 1
+            self.history.append((self.last_id, kind, rows))
+            self.published += 1
+            event = (self.event_id(self.last_id), kind, rows)
+            for queue in list(self.subscribers):
+                if queue.qsize() >= self.buffer_size:
+                    # Slow consumer: the spare slot carries the hang-up
+                    self.subscribers.discard(queue)
+                    queue.put_nowait(None)
+                    self.dropped += 1
+                else:
+                    queue.put_nowait(event)
+
+    def start(self):
+        self.inbox = asyncio.Queue()
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+        for queue in list(self.subscribers):
+            self.unsubscribe(queue)
+            queue.put_nowait(None)
+
+    def stats(self):
+        return {"subscribers": len(self.subscribers), "published": self.published, "dropped": self.dropped}
+
+
+def format_sse(event):
+    event_id, kind, rows = event
+    return f"id: {event_id}\nevent: {kind}\ndata: {json.dumps(rows)}\n\n"
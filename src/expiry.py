@@ -0,0 +1,149 @@
+import asyncio
+import heapq
+import time
+from datetime import date, datetime, timedelta
+from src.logic import db_pages
+
+
+def parse_date(value):
+    """
+    Parse a YYYY-MM-DD (or ISO timestamp) value, None if missing or invalid
+    """
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(str(value)[:10])
+    except ValueError:
+        return None
+
+
+class ExpiryScheduler:
+    """
+    Retires available donations once their expiry_date has passed.
+
+    Keeps a min-heap of (expiry_date, donation_id) built from one cursor scan
+    at startup and kept current from DonationManager write events. Entries
+    that are claimed, deleted or re-dated are dropped lazily when popped.
+    """
+    def __init__(self, donations, page_size=500, batch_size=500, max_sleep=3600.0, retry_delay=30.0):
+        self.donations = donations
+        self.page_size = page_size
+        self.batch_size = batch_size
+        self.max_sleep = max_sleep
+        self.retry_delay = retry_delay
+        self.heap = []
+        self.live = {}
+        self.wakeup = asyncio.Event()
+        self.task = None
+        self.sweeps = 0
+        self.retired = 0
+        self.last_sweep_seconds = 0.0
+        self.total_sweep_seconds = 0.0
+
+    # ---- Index maintenance ----
+    def track(self, donation):
+        donation_id = donation.get("donation_id")
+        expiry = parse_date(donation.get("expiry_date"))
+        if expiry is None:
+            self.discard(donation_id)
+            return
+        if self.live.get(donation_id) == expiry:
+            return
+        self.live[donation_id] = expiry
+        heapq.heappush(self.heap, (expiry, donation_id))
+        if self.heap[0] == (expiry, donation_id):
+            self.wakeup.set()
+        if len(self.heap) > 2 * len(self.live) + 64:
+            self.heap = [(expiry, donation_id) for donation_id, expiry in self.live.items()]
+            heapq.heapify(self.heap)
+
+    def discard(self, donation_id):
+        self.live.pop(donation_id, None)
+
+    def on_change(self, kind, rows):
+        for row in rows:
+            if kind != "delete" and row.get("status") == "available":
+                self.track(row)
+            else:
+                self.discard(row.get("donation_id"))
+
+    async def load(self):
+        pages = db_pages(self.donations.db.get_available_donations, "donation_id", page_size=self.page_size)
+        async for page in pages:
+            for donation in page:
+                self.track(donation)
+
+    # ---- Sweeping ----
+    def pop_due(self, today):
+        due = []
+        while self.heap and self.heap[0][0] < today:
+            expiry, donation_id = heapq.heappop(self.heap)
+            if self.live.get(donation_id) == expiry:
+                del self.live[donation_id]
+                due.append((expiry, donation_id))
+        return due
+
+    async def sweep(self, today=None):
+        """
+        Mark every due donation as expired; returns False if a write failed
+        """
+        start = time.perf_counter()
+        due = self.pop_due(today or date.today())
+        ok = True
+        for i in range(0, len(due), self.batch_size):
+            batch = due[i:i + self.batch_size]
+            # Conditional, so rows another worker claimed, accepted or
+            # distributed since they were tracked here are left alone
+            expired = await self.donations.transition_donation_statuses(
+                [d for _, d in batch], "available", "expired"
+            )
+            if expired is not None:
+                self.retired += len(expired)
+            else:
+                # The write failed: keep the batch for a retry
+                for expiry, donation_id in batch:
+                    self.live[donation_id] = expiry
+                    heapq.heappush(self.heap, (expiry, donation_id))
+                ok = False
+        self.last_sweep_seconds = time.perf_counter() - start
+        self.total_sweep_seconds += self.last_sweep_seconds
+        self.sweeps += 1
+        return ok
+
+    def seconds_until_next(self):
+        if not self.heap:
+            return self.max_sleep
+        due_at = datetime.combine(self.heap[0][0] + timedelta(days=1), datetime.min.time())
+        return min(max((due_at - datetime.now()).total_seconds(), 0.0), self.max_sleep)
+
+    async def run(self):
+        await self.load()
+        while True:
+            self.wakeup.clear()
+            delay = self.seconds_until_next() if await self.sweep() else self.retry_delay
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def start(self):
+        self.donations.add_listener(self.on_change)
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    def stats(self):
+        return {
+            "tracked": len(self.live),
+            "sweeps": self.sweeps,
+            "retired": self.retired,
+            "last_sweep_seconds": self.last_sweep_seconds,
+            "total_sweep_seconds": self.total_sweep_seconds,
+        }
@@ -1,4 +1,28 @@
-from src.db import DatabaseManager
+import asyncio
+import functools
+import hashlib
+import json
+import os
+import shutil
+import struct
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from multiprocessing import resource_tracker, shared_memory
+from src.db import QueryResponse, get_database_manager
+from src.writebehind import WriteBehind
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+DONATION_STATUSES = ["available", "requested", "accepted", "distributed", "expired"]
+# "requested" belongs to claims: only claim() and the request outcomes move
+# a donation into or out of it, never a manual status update
+CLIENT_DONATION_STATUSES = ["available", "accepted", "distributed", "expired"]
+REQUEST_STATUSES = ["pending", "accepted", "rejected"]
 
 def format_response(response, success_msg):
     """
@@ -11,70 +35,862 @@ def format_response(response, success_msg):
     return {"Success": False, "Message": "Unknown error"}
 
 
-class UserManager:
+async def iter_pages(fetch, key, page_size=500):
+    """
+    Yield successive keyset pages from fetch(limit, after) until exhausted
+    """
+    after = None
+    while True:
+        page = await fetch(limit=page_size, after=after)
+        if page:
+            yield page
+        if len(page) < page_size:
+            return
+        after = page[-1][key]
+        # Let other requests run between pages even when the backend
+        # answers without suspending (SQLite)
+        await asyncio.sleep(0)
+
+
+def db_pages(method, key, *args, page_size=500):
+    """
+    Keyset pages straight from a DatabaseManager list method, bypassing caches
+    """
+    async def fetch(limit, after):
+        response = await method(*args, limit=limit, after=after)
+        return response.data if hasattr(response, "data") else []
+    return iter_pages(fetch, key, page_size)
+
+
+# ---- Caching ----
+MISSING = object()
+# Where state shared between workers lives: memory-backed where the OS has it
+SHARED_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else tempfile.gettempdir()
+
+
+class LocalGeneration:
+    """
+    In-process invalidation counter. Writes made by other workers never
+    reach it, so tags built on it also roll over every lifetime seconds:
+    that bounds how long a worker can confirm a stale copy with a 304.
+    """
+    def __init__(self, lifetime=None):
+        self._value = 0
+        self.lifetime = lifetime
+        self.token = f"{os.getpid()}.{time.time_ns()}"
+
+    @property
+    def value(self):
+        return self._value
+
+    @property
+    def epoch(self):
+        return int(time.time() // self.lifetime) if self.lifetime else 0
+
+    def bump(self):
+        self._value += 1
+
+
+class SharedGeneration:
+    """
+    Invalidation counter in a named shared-memory block, so a write in one
+    uvicorn worker invalidates the cached entries of every other worker.
+    Increments hold an exclusive lock on a file named after the block, so
+    workers bumping at the same moment never lose one.
+
+    The block and the lock file deliberately outlive the workers, so a
+    restarted worker carries on from the same count; remove_shared()
+    deletes them once every worker has stopped.
+    """
+    def __init__(self, name):
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=8)
+            self.shm.buf[:8] = struct.pack("Q", 0)
+        except FileExistsError:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.token = name
+        self.lock = threading.Lock()
+        self.lock_file = open(os.path.join(tempfile.gettempdir(), f"{name}.lock"), "a") if fcntl else None
+        # Keep the block alive when any single worker exits
+        resource_tracker.unregister(self.shm._name, "shared_memory")
+
+    @property
+    def value(self):
+        return struct.unpack_from("Q", self.shm.buf)[0]
+
+    @property
+    def epoch(self):
+        # Every worker's writes bump the shared counter: tags need no expiry
+        return 0
+
+    def bump(self):
+        with self.lock:
+            if self.lock_file is not None:
+                fcntl.flock(self.lock_file, fcntl.LOCK_EX)
+            try:
+                struct.pack_into("Q", self.shm.buf, 0, self.value + 1)
+            finally:
+                if self.lock_file is not None:
+                    fcntl.flock(self.lock_file, fcntl.LOCK_UN)
+
+
+class SharedPageStore:
+    """
+    Cached values as JSON files in a directory under SHARED_DIR, so every
+    uvicorn worker can serve a page any one of them fetched. A file holds
+    [generation, expires, value] and is renamed into place whole, so
+    readers never see half of one. At most maxsize files are kept, the
+    least recently written going first.
+
+    Like the counters, the directory outlives the workers; remove_shared()
+    deletes it.
+    """
+    def __init__(self, name, maxsize=128):
+        self.path = os.path.join(SHARED_DIR, f"{name}-pages")
+        self.maxsize = maxsize
+        os.makedirs(self.path, exist_ok=True)
+
+    def _file(self, key):
+        return os.path.join(self.path, hashlib.sha1(repr(key).encode()).hexdigest())
+
+    def get(self, key):
+        """
+        (generation, expires, value) for key, expires on the time.time()
+        clock; None if nothing is stored
+        """
+        try:
+            with open(self._file(key)) as f:
+                return tuple(json.load(f))
+        except (OSError, ValueError):
+            return None
+
+    def set(self, key, value, generation, expires):
+        path = self._file(key)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "w") as f:
+            json.dump([generation, expires, value], f)
+        os.replace(temporary, path)
+        with os.scandir(self.path) as entries:
+            stored = [entry for entry in entries if not entry.name.endswith(".tmp")]
+        if len(stored) > self.maxsize:
+            stored.sort(key=lambda entry: entry.stat().st_mtime)
+            for entry in stored[:len(stored) - self.maxsize]:
+                try:
+                    os.unlink(entry.path)
+                except FileNotFoundError:
+                    pass
+
+
+class TTLCache:
+    """
+    Bounded LRU cache whose entries also expire after ttl seconds.
+    Entries are tagged with the generation current before the fetch that
+    produced them, so clear() drops anything read before a write.
+
+    With a SharedPageStore (and a SharedGeneration), a local miss is
+    looked up in the store before going to the backend, and every value
+    set is written through to it, so workers share one copy of each page.
+    """
+    def __init__(self, maxsize=128, ttl=5.0, generation=None, store=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.generation = generation or LocalGeneration()
+        self.store = store
+        self.data = OrderedDict()
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        entry = self.data.get(key)
+        if entry is not None:
+            value, expires, generation = entry
+            if expires > time.monotonic() and generation == self.generation.value:
+                self.data.move_to_end(key)
+                self.hits += 1
+                return value
+            del self.data[key]
+        if self.store is not None:
+            stored = self.store.get(key)
+            if stored is not None:
+                generation, expires, value = stored
+                remaining = expires - time.time()
+                if remaining > 0 and generation == self.generation.value:
+                    self._keep(key, value, time.monotonic() + remaining, generation)
+                    self.hits += 1
+                    self.shared_hits += 1
+                    return value
+        self.misses += 1
+        return MISSING
+
+    def set(self, key, value, generation):
+        self._keep(key, value, time.monotonic() + self.ttl, generation)
+        if self.store is not None:
+            self.store.set(key, value, generation, time.time() + self.ttl)
+
+    def _keep(self, key, value, expires, generation):
+        self.data[key] = (value, expires, generation)
+        self.data.move_to_end(key)
+        while len(self.data) > self.maxsize:
+            self.data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self.generation.bump()
+        self.data.clear()
+
+    def stats(self):
+        return {"hits": self.hits, "shared_hits": self.shared_hits, "misses": self.misses,
+                "evictions": self.evictions, "size": len(self.data)}
+
+
+def generation_from_env(prefix, lifetime=5.0):
+    """
+    Write counter for a table, shared across workers when CACHE_SHARED_NAME
+    is set; otherwise process-local, with tags expiring after
+    <prefix>_CACHE_TTL seconds
+    """
+    shared_name = os.getenv("CACHE_SHARED_NAME")
+    if shared_name:
+        return SharedGeneration(f"{shared_name}-{prefix.lower()}")
+    return LocalGeneration(float(os.getenv(f"{prefix}_CACHE_TTL", lifetime)))
+
+
+def cache_from_env(prefix, maxsize=128, ttl=5.0, shared=False):
+    """
+    Build a TTLCache from <prefix>_CACHE_SIZE / <prefix>_CACHE_TTL. With
+    shared set and CACHE_SHARED_NAME given, the cached values themselves
+    are shared across workers too; they must be plain JSON.
+    """
+    maxsize = int(os.getenv(f"{prefix}_CACHE_SIZE", maxsize))
+    shared_name = os.getenv("CACHE_SHARED_NAME")
+    store = SharedPageStore(f"{shared_name}-{prefix.lower()}", maxsize) if shared and shared_name else None
+    return TTLCache(
+        maxsize=maxsize,
+        ttl=float(os.getenv(f"{prefix}_CACHE_TTL", ttl)),
+        generation=generation_from_env(prefix, ttl),
+        store=store,
+    )
+
+
+def remove_shared(shared_name, prefixes=("user", "donation", "request", "idempotency")):
+    """
+    Delete the counters, lock files and page stores that workers run with
+    CACHE_SHARED_NAME=shared_name leave behind; only once all have stopped
+    """
+    for prefix in prefixes:
+        name = f"{shared_name}-{prefix}"
+        try:
+            shm = shared_memory.SharedMemory(name=name)
+        except FileNotFoundError:
+            pass
+        else:
+            shm.close()
+            shm.unlink()
+        try:
+            os.unlink(os.path.join(tempfile.gettempdir(), f"{name}.lock"))
+        except FileNotFoundError:
+            pass
+        shutil.rmtree(os.path.join(SHARED_DIR, f"{name}-pages"), ignore_errors=True)
+
+
+def version_tag(name, generation, *parts):
+    """
+    ETag for a list view: changes whenever the table's write counter does,
+    and when a process-local counter's lifetime runs out
+    """
+    suffix = "-".join(str(p) for p in parts)
+    return f'W/"{name}-{generation.token}.{generation.value}.{generation.epoch}-{suffix}"'
+
+
+class SingleFlight:
+    """
+    Collapses concurrent identical reads into one backend call.
+
+    Callers passing the same key while a call for it is in flight wait for
+    that call and share its result (or exception) instead of issuing their
+    own. do() serves asyncio callers; the backend call runs as its own task
+    so a cancelled caller never cancels it for the others. do_sync() serves
+    threaded callers.
+    """
     def __init__(self):
-        self.db = DatabaseManager()
+        self.inflight = {}
+        self.sync_inflight = {}
+        self.lock = threading.Lock()
+        self.executed = 0
+        self.collapsed = 0
+
+    async def do(self, key, fn, *args):
+        task = self.inflight.get(key)
+        if task is not None and not task.done():
+            self.collapsed += 1
+        else:
+            self.executed += 1
+            task = self.inflight[key] = asyncio.ensure_future(fn(*args))
+            task.add_done_callback(lambda done: self.inflight.pop(key, None) if self.inflight.get(key) is done else None)
+        return await asyncio.shield(task)
+
+    def do_sync(self, key, fn, *args):
+        with self.lock:
+            call = self.sync_inflight.get(key)
+            leader = call is None
+            if leader:
+                self.executed += 1
+                call = self.sync_inflight[key] = {"done": threading.Event()}
+            else:
+                self.collapsed += 1
+        if not leader:
+            call["done"].wait()
+            if "error" in call:
+                raise call["error"]
+            return call["result"]
+        try:
+            call["result"] = fn(*args)
+            return call["result"]
+        except BaseException as e:
+            call["error"] = e
+            raise
+        finally:
+            with self.lock:
+                del self.sync_inflight[key]
+            call["done"].set()
+
+    def stats(self):
+        return {"executed": self.executed, "collapsed": self.collapsed, "in_flight": len(self.inflight) + len(self.sync_inflight)}
+
+
+class UserDirectory:
+    """
+    Email-keyed index of users resolving to (user_id, role).
+    Misses fall back to a single lookup by email. Entries are tagged with
+    the users write counter current before they were read, and expire
+    after ttl seconds, so a user changed or deleted through another worker
+    stops resolving once that worker's write is visible.
+    """
+    def __init__(self, db, flight=None, generation=None, ttl=60.0):
+        self.db = db
+        self.flight = flight if flight is not None else SingleFlight()
+        self.generation = generation or LocalGeneration()
+        self.ttl = ttl
+        self.by_email = {}
+        self.email_by_id = {}
+
+    def add(self, user, generation=None):
+        if not user or not user.get("email"):
+            return
+        self.discard(user.get("user_id"))
+        if generation is None:
+            generation = self.generation.value
+        self.by_email[user["email"]] = (user["user_id"], user.get("role"), generation, time.monotonic() + self.ttl)
+        self.email_by_id[user["user_id"]] = user["email"]
+
+    def discard(self, user_id):
+        email = self.email_by_id.pop(user_id, None)
+        if email is not None:
+            self.by_email.pop(email, None)
+
+    async def lookup(self, email):
+        entry = self.by_email.get(email)
+        if entry is not None and entry[2] == self.generation.value and entry[3] > time.monotonic():
+            return entry[:2]
+        generation = self.generation.value
+        response = await self.flight.do(("get_user_by_email", email, generation), self.db.get_user_by_email, email)
+        rows = response.data if hasattr(response, "data") else []
+        if not rows:
+            if entry is not None:
+                self.discard(entry[0])
+            return None
+        self.add(rows[0], generation)
+        return self.by_email[email][:2]
+
+
+async def shared_read(manager, name, *args):
+    """
+    Backend read through the manager's single-flight group. The key carries
+    the table's write counter, so a read issued after a write never joins
+    a call that started before it.
+    """
+    key = (name, *args, manager.version.value)
+    return await manager.flight.do(key, getattr(manager.db, name), *args)
+
 
-    def add_user(self, name, email, password, role):
+class UserManager:
+    def __init__(self, db=None, flight=None, donations=None, requests=None):
+        self.db = db if db is not None else get_database_manager()
+        self.flight = flight if flight is not None else SingleFlight()
+        self.version = generation_from_env("USER")
+        self.directory = UserDirectory(self.db, self.flight, self.version)
+        # Deleting a user cascades to its donations and requests; these
+        # managers are told so their caches, tags and listeners follow
+        self.donations = donations
+        self.requests = requests
+        self.listeners = []
+
+    def add_listener(self, listener):
+        """
+        Register listener(kind, rows), called after every successful write
+        with kind "insert", "update" or "delete"
+        """
+        self.listeners.append(listener)
+
+    def etag(self, *parts):
+        return version_tag("users", self.version, *parts)
+
+    def _written(self, kind, response):
+        self.version.bump()
+        rows = getattr(response, "data", None)
+        if rows and not getattr(response, "error", None):
+            for listener in self.listeners:
+                listener(kind, rows)
+
+    async def add_user(self, name, email, password, role):
         if role not in ["donor", "ngo"]:
             return {"Success": False, "Message": "Invalid role"}
-        response = self.db.create_user(name, email, password, role)
+        response = await self.db.create_user(name, email, password, role)
+        self._written("insert", response)
+        for user in getattr(response, "data", None) or []:
+            self.directory.add(user)
         return format_response(response, "User added successfully!")
 
-    def get_users(self):
-        response = self.db.get_all_users()
-        return response.data if hasattr(response, "data") else []  
+    async def get_users(self, limit=None, after=None):
+        response = await shared_read(self, "get_all_users", limit, after)
+        return response.data if hasattr(response, "data") else []
+
+    def iter_users(self, page_size=500):
+        return iter_pages(self.get_users, "user_id", page_size)
 
-    def update_user(self, user_id, name=None, email=None, password=None, role=None):
-        response = self.db.update_user(user_id, name, email, password, role)
+    async def update_user(self, user_id, name=None, email=None, password=None, role=None):
+        response = await self.db.update_user(user_id, name, email, password, role)
+        self._written("update", response)
+        for user in getattr(response, "data", None) or []:
+            self.directory.add(user)
         return format_response(response, "User updated successfully!")
 
-    def delete_user(self, user_id):
-        response = self.db.delete_user(user_id)
+    async def delete_user(self, user_id):
+        # ON DELETE CASCADE raises no events: collect the rows it will take
+        donations = await self.donations.get_donations_by_user(user_id) if self.donations else []
+        requests = []
+        if self.requests is not None:
+            requests = await self.requests.get_requests_by_ngo(user_id) + await self.requests.get_requests_by_donor(user_id)
+        response = await self.db.delete_user(user_id)
+        self._written("delete", response)
+        if getattr(response, "data", None):
+            self.directory.discard(user_id)
+            # Donations first, so a released request cannot re-list a
+            # donation that is gone
+            if self.donations is not None:
+                self.donations.cascaded(donations)
+            if self.requests is not None:
+                # Pending requests were holding their donations as
+                # "requested"; with the requests gone, hand them back
+                await self.requests.donations.transition_donation_statuses(
+                    [row["donation_id"] for row in requests if row.get("ngo_id") == user_id and row.get("status") == "pending"],
+                    "requested", "available",
+                )
+                self.requests.cascaded(list({row["request_id"]: row for row in requests}.values()))
         return format_response(response, "User deleted successfully!")
 
+    async def get_user(self, user_id, role=None):
+        """
+        The user row (user_id, email, role) for an id, optionally requiring a role
+        """
+        response = await shared_read(self, "get_user_by_id", user_id)
+        rows = response.data if hasattr(response, "data") else []
+        if not rows or (role and rows[0].get("role") != role):
+            return None
+        return rows[0]
+
+    async def find_user(self, email, role=None):
+        """
+        Resolve an email to (user_id, role), optionally requiring a role
+        """
+        entry = await self.directory.lookup(email)
+        if entry is None or (role and entry[1] != role):
+            return None
+        return entry
+
 
 class DonationManager:
-    def __init__(self):
-        self.db = DatabaseManager()
+    def __init__(self, db=None, cache=None, flight=None):
+        self.db = db if db is not None else get_database_manager()
+        self.flight = flight if flight is not None else SingleFlight()
+        self.cache = cache if cache is not None else cache_from_env("DONATION", shared=True)
+        self.version = self.cache.generation
+        self.listeners = []
+        self.write_behind = None
+        # Set by the RequestManager built on top, whose rows cascade from ours
+        self.requests = None
+
+    def add_listener(self, listener):
+        """
+        Register listener(kind, rows), called after every successful write
+        with kind "insert", "update" or "delete"
+        """
+        self.listeners.append(listener)
+
+    def etag(self, *parts):
+        return version_tag("donations", self.version, *parts)
 
-    def add_donation(self, user_id, food_item, quantity, expiry_date):
-        response = self.db.create_donation(user_id, food_item, quantity, expiry_date)
+    def _written(self, kind, response):
+        self.cache.clear()
+        rows = getattr(response, "data", None)
+        if rows and not getattr(response, "error", None):
+            for listener in self.listeners:
+                listener(kind, rows)
+
+    def enable_write_behind(self, **options):
+        """
+        Route add_donation through a WriteBehind queue, so concurrent
+        single inserts reach the database as multi-row ones
+        """
+        self.write_behind = WriteBehind(self._insert_batch, **options)
+        return self.write_behind
+
+    async def add_donation(self, user_id, food_item, quantity, expiry_date):
+        if self.write_behind is not None:
+            return await self.write_behind.submit({
+                "user_id": user_id,
+                "food_item": food_item,
+                "quantity": quantity,
+                "expiry_date": expiry_date,
+            })
+        response = await self.db.create_donation(user_id, food_item, quantity, expiry_date)
+        self._written("insert", response)
         return format_response(response, "Donation added successfully!")
 
-    def get_available_donations(self):
-        response = self.db.get_available_donations()
+    async def _insert_batch(self, rows):
+        # One result per row; if the batch fails as a whole, bisect it so a
+        # bad row only fails itself, in about 2 log2(n) extra inserts
+        response = await self.db.create_donations(rows)
+        self._written("insert", response)
+        if not getattr(response, "error", None) and len(response.data or []) == len(rows):
+            return [format_response(QueryResponse([row]), "Donation added successfully!") for row in response.data]
+        if len(rows) == 1:
+            return [format_response(response, "Donation added successfully!")]
+        middle = len(rows) // 2
+        return await self._insert_batch(rows[:middle]) + await self._insert_batch(rows[middle:])
+
+    async def add_donations(self, rows):
+        """
+        Insert (row_number, donation) pairs in one multi-row insert and
+        report the outcome per row
+        """
+        results = await self._insert_batch([donation for _, donation in rows])
+        return [
+            {"Row": number, "Success": True, "Message": result["Message"], "Data": result["Data"][0]}
+            if result["Success"] else
+            {"Row": number, "Success": False, "Message": result["Message"]}
+            for (number, _), result in zip(rows, results)
+        ]
+
+    async def get_available_donations(self, limit=None, after=None):
+        key = (limit, after)
+        rows = self.cache.get(key)
+        if rows is not MISSING:
+            return rows
+        generation = self.cache.generation.value
+        response = await shared_read(self, "get_available_donations", limit, after)
+        if getattr(response, "error", None):
+            return []
+        rows = response.data if hasattr(response, "data") else []
+        self.cache.set(key, rows, generation)
+        return rows
+
+    def iter_available_donations(self, page_size=500):
+        """
+        Keyset pages of the whole feed for streaming; read past the cache so
+        a long stream neither fills it nor evicts the hot first page
+        """
+        return db_pages(self.db.get_available_donations, "donation_id", page_size=page_size)
+
+    def iter_all_donations(self, since=None, until=None, page_size=500):
+        """
+        Keyset pages of every donation created in [since, until)
+        """
+        fetch = functools.partial(self.db.get_all_donations, since=since, until=until)
+        return db_pages(fetch, "donation_id", page_size=page_size)
+
+    async def get_donations_by_user(self, user_id):
+        response = await shared_read(self, "get_donations_by_user", user_id)
         return response.data if hasattr(response, "data") else []
 
-    def update_donation_status(self, donation_id, status):
-        if status not in ["available", "accepted", "distributed"]:
+    async def update_donation_status(self, donation_id, status):
+        if status not in CLIENT_DONATION_STATUSES:
             return {"Success": False, "Message": "Invalid status"}
-        response = self.db.update_donation_status(donation_id, status)
+        response = await self.db.update_donation_status(donation_id, status, unless="requested")
+        self._written("update", response)
+        if not getattr(response, "data", None) and not getattr(response, "error", None):
+            return {"Success": False, "Message": "Donation not found or claimed by a pending request"}
         return format_response(response, "Donation status updated!")
 
-    def delete_donation(self, donation_id):
-        response = self.db.delete_donation(donation_id)
+    async def update_donation_statuses(self, donation_ids, status):
+        """
+        Set the status of several donations; donations claimed by a pending
+        request are left out and missing from Data
+        """
+        if status not in CLIENT_DONATION_STATUSES:
+            return {"Success": False, "Message": "Invalid status"}
+        if not donation_ids:
+            return {"Success": False, "Message": "No donations given"}
+        response = await self.db.update_donation_statuses(sorted(set(donation_ids)), status, unless="requested")
+        self._written("update", response)
+        if not getattr(response, "data", None) and not getattr(response, "error", None):
+            return {"Success": False, "Message": "No donations found that are not claimed by a pending request"}
+        return format_response(response, "Donation statuses updated!")
+
+    async def transition_donation_statuses(self, donation_ids, from_status, to_status):
+        """
+        Conditional status change; returns the rows that actually moved,
+        which is how concurrent claims on one donation pick a single winner,
+        or None if the write itself failed
+        """
+        if not donation_ids:
+            return []
+        response = await self.db.transition_donation_statuses(sorted(set(donation_ids)), from_status, to_status)
+        self._written("update", response)
+        if getattr(response, "error", None):
+            return None
+        return response.data or []
+
+    def cascaded(self, rows):
+        """
+        Report rows removed by a cascading delete elsewhere
+        """
+        self._written("delete", QueryResponse(rows))
+
+    async def delete_donation(self, donation_id):
+        requests = await self.requests.get_requests_by_donation(donation_id) if self.requests else []
+        response = await self.db.delete_donation(donation_id)
+        self._written("delete", response)
+        if self.requests is not None and getattr(response, "data", None):
+            self.requests.cascaded(requests)
         return format_response(response, "Donation deleted successfully!")
 
 
 class RequestManager:
-    def __init__(self):
-        self.db = DatabaseManager()
+    def __init__(self, db=None, flight=None, donations=None):
+        self.db = db if db is not None else get_database_manager()
+        self.flight = flight if flight is not None else SingleFlight()
+        self.donations = donations if donations is not None else DonationManager(self.db, flight=self.flight)
+        self.donations.requests = self
+        self.version = generation_from_env("REQUEST")
+        self.listeners = []
+        self.write_behind = None
 
-    def create_request(self, ngo_id, donation_id):
-        response = self.db.create_request(ngo_id, donation_id)
+    def add_listener(self, listener):
+        """
+        Register listener(kind, rows), called after every successful write
+        with kind "insert", "update" or "delete"
+        """
+        self.listeners.append(listener)
+
+    def etag(self, *parts):
+        return version_tag("requests", self.version, *parts)
+
+    def _written(self, kind, response):
+        self.version.bump()
+        rows = getattr(response, "data", None)
+        if rows and not getattr(response, "error", None):
+            for listener in self.listeners:
+                listener(kind, rows)
+
+    async def claim(self, pairs):
+        """
+        Claim donations for (ngo_id, donation_id) pairs and record a pending
+        request for each one won. The claim is a conditional
+        available -> requested update, so when several NGOs race for one
+        donation exactly one of them gets it, without any lock.
+        """
+        wanted = {}
+        for ngo_id, donation_id in pairs:
+            wanted.setdefault(donation_id, ngo_id)
+        won = await self.donations.transition_donation_statuses(list(wanted), "available", "requested")
+        if won is None:
+            return {"Success": False, "Message": "Could not claim donation"}
+        if not won:
+            return {"Success": False, "Message": "Donation is no longer available", "Conflict": True}
+        won_ids = sorted(row["donation_id"] for row in won)
+        response = await self.db.create_requests([(wanted[donation_id], donation_id) for donation_id in won_ids])
+        self._written("insert", response)
+        if getattr(response, "error", None) or not response.data:
+            await self.donations.transition_donation_statuses(won_ids, "requested", "available")
         return format_response(response, "Request created successfully!")
 
-    def get_requests_by_ngo(self, ngo_id):
-        response = self.db.get_requests_by_ngo(ngo_id)
+    def enable_write_behind(self, **options):
+        """
+        Route create_request through a WriteBehind queue, so concurrent
+        claims share one conditional update and one multi-row insert
+        """
+        self.write_behind = WriteBehind(self._claim_batch, **options)
+        return self.write_behind
+
+    async def create_request(self, ngo_id, donation_id):
+        if self.write_behind is not None:
+            return await self.write_behind.submit((ngo_id, donation_id))
+        return await self.claim([(ngo_id, donation_id)])
+
+    async def _claim_batch(self, pairs):
+        # Split one batched claim back into per-caller results: a pair whose
+        # donation went to another pair (in or outside the batch) conflicts,
+        # and so does a repeat of a pair, as it would have unbatched
+        result = await self.claim(pairs)
+        if result["Success"] or result.get("Conflict"):
+            won = {(row["ngo_id"], row["donation_id"]): row for row in result.get("Data") or []}
+            return [
+                {"Success": True, "Message": "Request created successfully!", "Data": [won.pop(pair)]}
+                if pair in won else
+                {"Success": False, "Message": "Donation is no longer available", "Conflict": True}
+                for pair in pairs
+            ]
+        if len(pairs) == 1:
+            return [result]
+        return [result for pair in pairs for result in await self._claim_batch([pair])]
+
+    async def create_requests(self, pairs):
+        """
+        Claim donations and create pending requests for (ngo_id, donation_id)
+        pairs in one conditional update and one insert; pairs whose donation
+        was already taken are left out of Data
+        """
+        if not pairs:
+            return {"Success": False, "Message": "No requests given"}
+        result = await self.claim(pairs)
+        if result["Success"]:
+            result["Message"] = "Requests created successfully!"
+        return result
+
+    def cascaded(self, rows):
+        """
+        Report rows removed by a cascading delete elsewhere
+        """
+        self._written("delete", QueryResponse(rows))
+
+    async def get_requests_by_donation(self, donation_id):
+        response = await self.db.get_request_status_by_donation(donation_id)
+        rows = response.data if hasattr(response, "data") else []
+        return [{**row, "donation_id": donation_id} for row in rows]
+
+    async def _settle(self, kind, response):
+        """
+        Carry request outcomes over to the claimed donations: rejected or
+        removed requests hand the donation back, accepted ones keep it
+        """
+        rows = getattr(response, "data", None)
+        if not rows or getattr(response, "error", None):
+            return
+        released = [r["donation_id"] for r in rows if kind == "delete" or r.get("status") == "rejected"]
+        accepted = [r["donation_id"] for r in rows if kind != "delete" and r.get("status") == "accepted"]
+        await self.donations.transition_donation_statuses(released, "requested", "available")
+        await self.donations.transition_donation_statuses(accepted, "requested", "accepted")
+
+    async def get_requests_by_ngo(self, ngo_id, limit=None, after=None):
+        response = await shared_read(self, "get_requests_by_ngo", ngo_id, limit, after)
+        return response.data if hasattr(response, "data") else []
+
+    def iter_request_history(self, since=None, until=None, page_size=500):
+        """
+        Keyset pages of every request created in [since, until), with the
+        NGO name and food item joined in
+        """
+        fetch = functools.partial(self.db.get_all_requests_with_user_info, since=since, until=until)
+        return db_pages(fetch, "request_id", page_size=page_size)
+
+    async def get_requests_with_donation_info(self, ngo_id):
+        response = await shared_read(self, "get_requests_with_donation_info_by_ngo", ngo_id)
         return response.data if hasattr(response, "data") else []
 
-    def update_request_status(self, request_id, status):
-        if status not in ["pending", "accepted", "rejected"]:
+    async def get_requests_by_donor(self, user_id):
+        response = await shared_read(self, "get_requests_by_donor", user_id)
+        rows = response.data if hasattr(response, "data") else []
+        return [{k: v for k, v in row.items() if k != "donations"} for row in rows]
+
+    def iter_requests_by_ngo(self, ngo_id, page_size=500):
+        async def fetch(limit, after):
+            return await self.get_requests_by_ngo(ngo_id, limit, after)
+        return iter_pages(fetch, "request_id", page_size)
+
+    async def update_request_status(self, request_id, status):
+        if status not in REQUEST_STATUSES:
             return {"Success": False, "Message": "Invalid request status"}
-        response = self.db.update_request_status(request_id, status)
+        response = await self.db.update_request_status(request_id, status)
+        self._written("update", response)
+        await self._settle("update", response)
         return format_response(response, "Request status updated!")
 
-    def delete_request(self, request_id):
-        response = self.db.delete_request(request_id)
+    async def update_request_statuses(self, request_ids, status):
+        if status not in REQUEST_STATUSES:
+            return {"Success": False, "Message": "Invalid request status"}
+        if not request_ids:
+            return {"Success": False, "Message": "No requests given"}
+        response = await self.db.update_request_statuses(sorted(set(request_ids)), status)
+        self._written("update", response)
+        await self._settle("update", response)
+        return format_response(response, "Request statuses updated!")
+
+    async def delete_request(self, request_id):
+        response = await self.db.delete_request(request_id)
+        self._written("delete", response)
+        await self._settle("delete", response)
         return format_response(response, "Request deleted successfully!")
+
+
+class Dashboard:
+    """
+    Everything one panel of the front end shows, gathered with concurrent
+    backend queries into a single response
+    """
+    def __init__(self, users, donations, requests):
+        self.users = users
+        self.donations = donations
+        self.requests = requests
+
+    def etag(self, panel, email):
+        return version_tag(
+            f"dashboard-{panel}", self.donations.version,
+            self.requests.version.token, self.requests.version.value, self.requests.version.epoch,
+            self.users.version.value, self.users.version.epoch, email,
+        )
+
+    async def ngo(self, email):
+        """
+        The NGO's requests with their donation details, and the available
+        donations it has not requested yet; None if email is not an NGO
+        """
+        ngo = await self.users.find_user(email, role="ngo")
+        if ngo is None:
+            return None
+        ngo_id = ngo[0]
+        requests, available = await asyncio.gather(
+            self.requests.get_requests_with_donation_info(ngo_id),
+            self.donations.get_available_donations(),
+        )
+        requested = {r["donation_id"] for r in requests}
+        return {
+            "ngo_id": ngo_id,
+            "requests": requests,
+            "available": [d for d in available if d["donation_id"] not in requested],
+        }
+
+    async def donor(self, email):
+        """
+        The donor's donations, each with the requests made for it;
+        None if email is not a donor
+        """
+        donor = await self.users.find_user(email, role="donor")
+        if donor is None:
+            return None
+        donor_id = donor[0]
+        donations, requests = await asyncio.gather(
+            self.donations.get_donations_by_user(donor_id),
+            self.requests.get_requests_by_donor(donor_id),
+        )
+        by_donation = {}
+        for r in requests:
+            by_donation.setdefault(r["donation_id"], []).append(
+                {"request_id": r["request_id"], "ngo_id": r["ngo_id"], "status": r["status"]}
+            )
+        return {
+            "donor_id": donor_id,
+            "donations": [{**d, "requests": by_donation.get(d["donation_id"], [])} for d in donations],
+        }
@@ -0,0 +1,279 @@
+import asyncio
+from bisect import bisect_left, insort
+from collections import Counter, deque
+from datetime import date
+from src.expiry import parse_date
+from src.logic import db_pages
+
+
+def urgency_key(donation):
+    """
+    Sort key: soonest expiry first, then largest quantity
+    """
+    try:
+        quantity = int(donation.get("quantity") or 0)
+    except (TypeError, ValueError):
+        quantity = 0
+    expiry = parse_date(donation.get("expiry_date")) or date.max
+    return (expiry, -quantity, donation["donation_id"])
+
+
+class MatchingEngine:
+    """
+    Pairs NGOs with available donations without touching the database.
+
+    Available donations are kept in a list sorted by urgency_key, so the
+    top-k candidates are a slice. Donations with a pending request are held
+    aside as reserved until the request is rejected or removed. Open NGO
+    demand waits in a FIFO queue of [ngo_id, count] entries. The known
+    NGOs, and the donations each has ever requested, are kept too, so
+    per-NGO candidates need no query either.
+
+    Events only cover writes made through this process's managers, so
+    the index is rebuilt from a fresh scan every interval seconds to pick
+    up writes from other workers and rows removed by cascades.
+    """
+    def __init__(self, donations, requests, users=None, page_size=500, interval=300.0):
+        self.donations = donations
+        self.requests = requests
+        self.users = users
+        self.page_size = page_size
+        self.interval = interval
+        self.index = []
+        self.entries = {}
+        self.reserved = {}
+        self.ngos = set()
+        self.requested = {}
+        self.demand = deque()
+        self.touched = None
+        self.replay = None
+        self.task = None
+        self.reloads = 0
+
+    # ---- Index maintenance ----
+    def add(self, donation):
+        donation_id = donation["donation_id"]
+        self.remove(donation_id)
+        if donation_id in self.reserved:
+            self.reserved[donation_id] = donation
+            return
+        key = urgency_key(donation)
+        insort(self.index, key)
+        self.entries[donation_id] = (key, donation)
+
+    def remove(self, donation_id):
+        entry = self.entries.pop(donation_id, None)
+        if entry is None:
+            return None
+        i = bisect_left(self.index, entry[0])
+        del self.index[i]
+        return entry[1]
+
+    def reserve(self, donation_id):
+        if donation_id not in self.reserved:
+            self.reserved[donation_id] = self.remove(donation_id)
+
+    def release(self, donation_id):
+        donation = self.reserved.pop(donation_id, None)
+        if donation is not None:
+            self.add(donation)
+
+    def on_donation_change(self, kind, rows):
+        for row in rows:
+            donation_id = row.get("donation_id")
+            if self.touched is not None:
+                self.touched.add(donation_id)
+            if kind != "delete" and row.get("status") == "available":
+                self.add(row)
+            else:
+                self.remove(donation_id)
+                self.reserved.pop(donation_id, None)
+
+    def on_request_change(self, kind, rows):
+        for row in rows:
+            donation_id = row.get("donation_id")
+            if self.touched is not None:
+                self.touched.add(donation_id)
+            if kind == "delete" or row.get("status") == "rejected":
+                self.release(donation_id)
+            else:
+                self.reserve(donation_id)
+            self.note_request(kind, row)
+
+    def on_user_change(self, kind, rows):
+        for row in rows:
+            self.note_user(kind, row)
+
+    def note_request(self, kind, row):
+        if self.replay is not None:
+            self.replay.append(("note_request", kind, row))
+        requested = self.requested.setdefault(row.get("ngo_id"), set())
+        if kind == "delete":
+            requested.discard(row.get("donation_id"))
+        else:
+            requested.add(row.get("donation_id"))
+
+    def note_user(self, kind, row):
+        if self.replay is not None:
+            self.replay.append(("note_user", kind, row))
+        user_id = row.get("user_id")
+        if kind != "delete" and row.get("role") == "ngo":
+            self.ngos.add(user_id)
+        else:
+            self.ngos.discard(user_id)
+        if kind == "delete":
+            self.requested.pop(user_id, None)
+
+    async def load(self):
+        """
+        Build the index from a full scan and swap it in; the live index
+        keeps serving until then
+        """
+        # Rows written while the scan runs are already current from their
+        # events; their scanned copies may be stale
+        self.touched, self.replay = set(), []
+        try:
+            fresh = MatchingEngine(self.donations, self.requests, self.users, self.page_size)
+            if self.users is not None:
+                async for page in db_pages(self.users.db.get_all_users, "user_id", page_size=self.page_size):
+                    fresh.ngos.update(user["user_id"] for user in page if user.get("role") == "ngo")
+            async for page in db_pages(self.requests.db.get_all_requests, "request_id", page_size=self.page_size):
+                for request in page:
+                    if request.get("status") == "pending":
+                        fresh.reserved[request["donation_id"]] = None
+                    fresh.requested.setdefault(request["ngo_id"], set()).add(request["donation_id"])
+            donations = []
+            async for page in db_pages(self.donations.db.get_available_donations, "donation_id",
+                                       page_size=self.page_size):
+                donations.extend(page)
+            fresh.add_many([d for d in donations if d["donation_id"] not in self.touched])
+            for donation_id in self.touched:
+                fresh.reserved.pop(donation_id, None)
+                fresh.remove(donation_id)
+                if donation_id in self.reserved:
+                    fresh.reserved[donation_id] = self.reserved[donation_id]
+                elif donation_id in self.entries:
+                    fresh.add(self.entries[donation_id][1])
+            # Request and user events seen during the scan, on top of it
+            for note, kind, row in self.replay:
+                getattr(fresh, note)(kind, row)
+        finally:
+            self.touched, self.replay = None, None
+        self.index, self.entries, self.reserved = fresh.index, fresh.entries, fresh.reserved
+        self.ngos, self.requested = fresh.ngos, fresh.requested
+        self.reloads += 1
+
+    def add_many(self, donations):
+        """
+        Bulk insert with a single sort instead of one insort per donation
+        """
+        for donation in donations:
+            self.remove(donation["donation_id"])
+        for donation in donations:
+            donation_id = donation["donation_id"]
+            if donation_id in self.reserved:
+                self.reserved[donation_id] = donation
+                continue
+            key = urgency_key(donation)
+            self.index.append(key)
+            self.entries[donation_id] = (key, donation)
+        self.index.sort()
+
+    async def run_reloads(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.load()
+            except Exception:
+                # Keep serving the event-maintained index; retry next round
+                pass
+
+    def start(self):
+        self.donations.add_listener(self.on_donation_change)
+        self.requests.add_listener(self.on_request_change)
+        if self.users is not None:
+            self.users.add_listener(self.on_user_change)
+        self.task = asyncio.create_task(self.run_reloads())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    # ---- Matching ----
+    def is_ngo(self, user_id):
+        return user_id in self.ngos
+
+    def top(self, k=10, ngo_id=None):
+        """
+        The k most urgent available donations, skipping any ngo_id has
+        already requested
+        """
+        exclude = self.requested.get(ngo_id, ())
+        candidates = []
+        for key in self.index:
+            if len(candidates) == k:
+                break
+            if key[2] not in exclude:
+                candidates.append(self.entries[key[2]][1])
+        return candidates
+
+    def add_demand(self, ngo_id, count=1):
+        if count > 0:
+            self.demand.append([ngo_id, count])
+
+    def assign(self):
+        """
+        Hand out donations most-urgent first, one per NGO in round-robin
+        order, until demand or supply runs out. Returns (ngo_id, donation).
+        """
+        assignments, taken = [], 0
+        while self.demand and taken < len(self.index):
+            entry = self.demand.popleft()
+            donation_id = self.index[taken][2]
+            taken += 1
+            donation = self.reserved[donation_id] = self.entries.pop(donation_id)[1]
+            assignments.append((entry[0], donation))
+            entry[1] -= 1
+            if entry[1] > 0:
+                self.demand.append(entry)
+        # Drop the handed-out head of the index in one slice
+        del self.index[:taken]
+        return assignments
+
+    async def run(self):
+        """
+        Assign queued demand and record each pairing as a pending request
+        """
+        assignments = self.assign()
+        if not assignments:
+            return {"Success": True, "Message": "Nothing to match", "Data": []}
+        result = await self.requests.create_requests(
+            [(ngo_id, donation["donation_id"]) for ngo_id, donation in assignments]
+        )
+        if not result.get("Success") and not result.get("Conflict"):
+            # Give the donations back but drop the batch's demand: requeued,
+            # a pairing the backend refuses would fail every later run too
+            for _, donation in assignments:
+                self.release(donation["donation_id"])
+            return result
+        # Donations claimed elsewhere first are not available any more:
+        # drop them and put their NGOs back in the queue
+        won = {row["donation_id"] for row in result.get("Data") or []}
+        lost = [(ngo_id, donation) for ngo_id, donation in assignments if donation["donation_id"] not in won]
+        for _, donation in lost:
+            self.reserved.pop(donation["donation_id"], None)
+        self.requeue(ngo_id for ngo_id, _ in lost)
+        return result
+
+    def requeue(self, ngo_ids):
+        for ngo_id, count in Counter(ngo_ids).items():
+            self.add_demand(ngo_id, count)
+
+    def stats(self):
+        return {"available": len(self.index), "reserved": len(self.reserved), "open_demand": len(self.demand),
+                "ngos": len(self.ngos), "reloads": self.reloads}
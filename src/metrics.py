@@ -0,0 +1,200 @@
+import heapq
+import itertools
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+# DB calls made while serving the current request, when profiling is on
+current_trace = ContextVar("current_trace", default=None)
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram. Buckets are preallocated and observations are
+    plain increments, so the hot path takes no locks.
+    """
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name, labels):
+        lines, total = [], 0
+        for bound, count in zip(self.buckets + ("+Inf",), self.counts):
+            total += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {total}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+
+class DBCallStats:
+    __slots__ = ("latency", "rows", "errors")
+
+    def __init__(self):
+        self.latency = Histogram()
+        self.rows = 0
+        self.errors = 0
+
+
+class Metrics:
+    """
+    Route and DatabaseManager instrumentation rendered in Prometheus text
+    format. With profile_slowest > 0 the slowest requests are kept along
+    with the DB calls they made.
+    """
+    def __init__(self, profile_slowest=0):
+        self.route_latency = {}
+        self.route_status = {}
+        self.response_bytes = {}
+        self.request_bytes = {}
+        self.db_calls = {}
+        self.in_flight = 0
+        self.gauges = []
+        self.profile_slowest = profile_slowest
+        self.slowest = []
+        self.sequence = itertools.count()
+
+    # ---- Recording ----
+    def observe_request(self, method, route, status, seconds, request_size, response_size, trace):
+        key = (method, route)
+        latency = self.route_latency.get(key)
+        if latency is None:
+            latency = self.route_latency[key] = Histogram()
+            self.request_bytes[key] = Histogram(SIZE_BUCKETS)
+            self.response_bytes[key] = Histogram(SIZE_BUCKETS)
+        latency.observe(seconds)
+        self.request_bytes[key].observe(request_size)
+        self.response_bytes[key].observe(response_size)
+        status_key = (method, route, status)
+        self.route_status[status_key] = self.route_status.get(status_key, 0) + 1
+        if trace is not None:
+            record = (seconds, next(self.sequence), {
+                "method": method, "route": route, "status": status,
+                "seconds": seconds, "db_calls": trace,
+            })
+            if len(self.slowest) < self.profile_slowest:
+                heapq.heappush(self.slowest, record)
+            elif seconds > self.slowest[0][0]:
+                heapq.heapreplace(self.slowest, record)
+
+    def instrument_db(self, db):
+        """
+        Wrap the public query methods of a DatabaseManager instance to
+        record call counts, latency and row counts
+        """
+        for name in dir(type(db)):
+            if name.startswith("_") or name in ("open", "close") or not callable(getattr(type(db), name)):
+                continue
+            setattr(db, name, self._timed(name, getattr(db, name)))
+
+    def _timed(self, name, method):
+        stats = self.db_calls[name] = DBCallStats()
+
+        async def call(*args, **kwargs):
+            start = time.perf_counter()
+            response = await method(*args, **kwargs)
+            elapsed = time.perf_counter() - start
+            rows = len(getattr(response, "data", None) or [])
+            stats.latency.observe(elapsed)
+            stats.rows += rows
+            if getattr(response, "error", None):
+                stats.errors += 1
+            trace = current_trace.get()
+            if trace is not None:
+                trace.append({"method": name, "seconds": elapsed, "rows": rows})
+            return response
+        return call
+
+    def add_gauges(self, prefix, collect):
+        """
+        Export the numeric values of collect() as <prefix>_<key> gauges
+        """
+        self.gauges.append((prefix, collect))
+
+    # ---- Exposition ----
+    def render(self):
+        lines = ["# TYPE http_request_duration_seconds histogram"]
+        for (method, route), hist in self.route_latency.items():
+            lines += hist.render("http_request_duration_seconds", f'method="{method}",route="{route}"')
+        lines.append("# TYPE http_requests_total counter")
+        for (method, route, status), count in self.route_status.items():
+            lines.append(f'http_requests_total{{method="{method}",route="{route}",status="{status}"}} {count}')
+        lines.append("# TYPE http_request_size_bytes histogram")
+        for (method, route), hist in self.request_bytes.items():
+            lines += hist.render("http_request_size_bytes", f'method="{method}",route="{route}"')
+        lines.append("# TYPE http_response_size_bytes histogram")
+        for (method, route), hist in self.response_bytes.items():
+            lines += hist.render("http_response_size_bytes", f'method="{method}",route="{route}"')
+        lines.append("# TYPE http_requests_in_flight gauge")
+        lines.append(f"http_requests_in_flight {self.in_flight}")
+        lines.append("# TYPE db_call_duration_seconds histogram")
+        for name, stats in self.db_calls.items():
+            lines += stats.latency.render("db_call_duration_seconds", f'method="{name}"')
+        lines.append("# TYPE db_rows_total counter")
+        for name, stats in self.db_calls.items():
+            lines.append(f'db_rows_total{{method="{name}"}} {stats.rows}')
+        lines.append("# TYPE db_errors_total counter")
+        for name, stats in self.db_calls.items():
+            lines.append(f'db_errors_total{{method="{name}"}} {stats.errors}')
+        for prefix, collect in self.gauges:
+            for key, value in collect().items():
+                if isinstance(value, (int, float)):
+                    lines.append(f"# TYPE {prefix}_{key} gauge")
+                    lines.append(f"{prefix}_{key} {value}")
+        return "\n".join(lines) + "\n"
+
+    def slowest_requests(self):
+        return [record for _, _, record in sorted(self.slowest, reverse=True)]
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware timing every HTTP request by its route template
+    """
+    def __init__(self, app, metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        metrics = self.metrics
+        metrics.in_flight += 1
+        trace = [] if metrics.profile_slowest else None
+        token = current_trace.set(trace)
+        status, size = 500, 0
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - start
+            metrics.in_flight -= 1
+            current_trace.reset(token)
+            route = getattr(scope.get("route"), "path", None) or "unmatched"
+            request_size = 0
+            for name, value in scope.get("headers", []):
+                if name == b"content-length":
+                    request_size = int(value or 0)
+            metrics.observe_request(scope["method"], route, status, elapsed, request_size, size, trace)
@@ -0,0 +1,256 @@
+import asyncio
+import heapq
+import re
+from bisect import bisect_left, insort
+from datetime import date
+from src.expiry import parse_date
+from src.logic import db_pages
+
+TOKEN = re.compile(r"[a-z0-9]+")
+
+# Match quality of a query token against an indexed term
+EXACT, PREFIX, FUZZY = 3, 2, 1
+
+
+def tokenize(text):
+    return TOKEN.findall(str(text or "").lower())
+
+
+def trigrams(term):
+    padded = f"${term}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a, b, limit):
+    """
+    Levenshtein distance between a and b, or limit + 1 once it exceeds limit
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, start=1):
+        current = [i]
+        for j, cb in enumerate(b, start=1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+
+class SearchIndex:
+    """
+    Inverted index over the food_item of available donations.
+
+    Each term keeps a posting list sorted by (expiry, donation_id), so the
+    soonest-expiring matches of a term are a prefix of its list. Query
+    tokens match terms exactly, by prefix (a bisect over the sorted
+    vocabulary) or within a small edit distance of a term sharing one of
+    its trigrams. Results rank by match quality, then by soonest expiry.
+
+    Like the matching index, it is rebuilt from a fresh scan every
+    interval seconds to pick up writes made outside this process.
+    """
+    def __init__(self, donations, page_size=500, interval=300.0):
+        self.donations = donations
+        self.page_size = page_size
+        self.interval = interval
+        self.postings = {}
+        self.docs = {}
+        self.terms = []
+        self.grams = {}
+        self.queries = 0
+        self.touched = None
+        self.task = None
+        self.reloads = 0
+
+    # ---- Index maintenance ----
+    def _add_term(self, term):
+        self.postings[term] = []
+        insort(self.terms, term)
+        for gram in trigrams(term):
+            self.grams.setdefault(gram, set()).add(term)
+
+    def _drop_term(self, term):
+        del self.postings[term]
+        del self.terms[bisect_left(self.terms, term)]
+        for gram in trigrams(term):
+            terms = self.grams[gram]
+            terms.discard(term)
+            if not terms:
+                del self.grams[gram]
+
+    def _entry(self, donation):
+        expiry = parse_date(donation.get("expiry_date")) or date.max
+        return (expiry.toordinal(), donation["donation_id"]), set(tokenize(donation.get("food_item")))
+
+    def add(self, donation):
+        self.remove(donation["donation_id"])
+        key, terms = self._entry(donation)
+        for term in terms:
+            if term not in self.postings:
+                self._add_term(term)
+            insort(self.postings[term], key)
+        self.docs[donation["donation_id"]] = (key, terms, donation)
+
+    def add_many(self, donations):
+        """
+        Bulk insert with one sort per touched term instead of an insort per row
+        """
+        for donation in donations:
+            self.remove(donation["donation_id"])
+        touched = set()
+        for donation in donations:
+            key, terms = self._entry(donation)
+            for term in terms:
+                if term not in self.postings:
+                    self._add_term(term)
+                self.postings[term].append(key)
+            touched |= terms
+            self.docs[donation["donation_id"]] = (key, terms, donation)
+        for term in touched:
+            self.postings[term].sort()
+
+    def remove(self, donation_id):
+        entry = self.docs.pop(donation_id, None)
+        if entry is None:
+            return
+        key, terms, _ = entry
+        for term in terms:
+            posting = self.postings[term]
+            del posting[bisect_left(posting, key)]
+            if not posting:
+                self._drop_term(term)
+
+    def on_donation_change(self, kind, rows):
+        for row in rows:
+            if self.touched is not None:
+                self.touched.add(row.get("donation_id"))
+            if kind != "delete" and row.get("status") == "available":
+                self.add(row)
+            else:
+                self.remove(row.get("donation_id"))
+
+    async def load(self):
+        """
+        Build the index from a full scan and swap it in; the live index
+        keeps answering queries until then
+        """
+        # Rows written while the scan runs are already current from their
+        # events; their scanned copies may be stale
+        self.touched = set()
+        try:
+            donations = []
+            async for page in db_pages(self.donations.db.get_available_donations, "donation_id",
+                                       page_size=self.page_size):
+                donations.extend(page)
+            fresh = SearchIndex(self.donations, self.page_size)
+            fresh.add_many([d for d in donations if d["donation_id"] not in self.touched])
+            for donation_id in self.touched:
+                if donation_id in self.docs:
+                    fresh.add(self.docs[donation_id][2])
+        finally:
+            self.touched = None
+        self.postings, self.docs, self.terms, self.grams = fresh.postings, fresh.docs, fresh.terms, fresh.grams
+        self.reloads += 1
+
+    async def run_reloads(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.load()
+            except Exception:
+                # Keep serving the event-maintained index; retry next round
+                pass
+
+    def start(self):
+        self.donations.add_listener(self.on_donation_change)
+        self.task = asyncio.create_task(self.run_reloads())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    # ---- Queries ----
+    def match_terms(self, token):
+        """
+        Map every indexed term that token matches to its match quality
+        """
+        matches = {}
+        i = bisect_left(self.terms, token)
+        while i < len(self.terms) and self.terms[i].startswith(token):
+            matches[self.terms[i]] = EXACT if self.terms[i] == token else PREFIX
+            i += 1
+        if len(token) >= 3:
+            limit = 1 if len(token) <= 5 else 2
+            candidates = set()
+            for gram in trigrams(token):
+                candidates |= self.grams.get(gram, set())
+            for term in candidates - matches.keys():
+                if edit_distance(token, term, limit) <= limit:
+                    matches[term] = FUZZY
+        return matches
+
+    def search(self, query, limit=20):
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+        self.queries += 1
+        matched = [self.match_terms(token) for token in tokens]
+        if not all(matched):
+            return []
+        if len(matched) == 1:
+            return self._search_one(matched[0], limit)
+        return self._search_all(matched, limit)
+
+    def _search_one(self, matches, limit):
+        # Walk quality tiers best first; each tier merges already-sorted
+        # posting lists, so only the returned prefix is ever touched
+        results, seen = [], set()
+        for quality in (EXACT, PREFIX, FUZZY):
+            lists = [self.postings[term] for term, q in matches.items() if q == quality]
+            for key in heapq.merge(*lists):
+                if key[1] in seen:
+                    continue
+                seen.add(key[1])
+                results.append(self.docs[key[1]][2])
+                if len(results) == limit:
+                    return results
+        return results
+
+    def _search_all(self, matched, limit):
+        # Every token must match: walk the postings of the token with the
+        # fewest of them in expiry order, score the other tokens against
+        # each donation's terms, and stop once limit best-possible matches
+        # are found since everything after them ranks lower
+        sizes = [sum(len(self.postings[term]) for term in matches) for matches in matched]
+        driver = matched[sizes.index(min(sizes))]
+        best_possible = sum(max(matches.values()) for matches in matched)
+        ranked, perfect, previous = [], 0, None
+        for key in heapq.merge(*(self.postings[term] for term in driver)):
+            if key == previous:
+                continue
+            previous = key
+            terms = self.docs[key[1]][1]
+            score = 0
+            for matches in matched:
+                best = max((matches.get(term, 0) for term in terms), default=0)
+                if not best:
+                    break
+                score += best
+            else:
+                ranked.append((-score, key))
+                if score == best_possible:
+                    perfect += 1
+                    if perfect == limit:
+                        break
+        return [self.docs[key[1]][2] for _, key in heapq.nsmallest(limit, ranked)]
+
+    def stats(self):
+        return {"donations": len(self.docs), "terms": len(self.terms), "queries": self.queries,
+                "reloads": self.reloads}
@@ -0,0 +1,278 @@
+import sqlite3
+from src.db import DatabaseManager, QueryResponse
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    user_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    email TEXT UNIQUE NOT NULL,
+    password TEXT NOT NULL,
+    role TEXT CHECK(role IN ('donor','ngo')) NOT NULL,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS donations (
+    donation_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user_id INTEGER REFERENCES users(user_id) ON DELETE CASCADE,
+    food_item TEXT NOT NULL,
+    quantity TEXT NOT NULL,
+    expiry_date DATE,
+    status TEXT DEFAULT 'available',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE IF NOT EXISTS requests (
+    request_id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ngo_id INTEGER REFERENCES users(user_id) ON DELETE CASCADE,
+    donation_id INTEGER REFERENCES donations(donation_id) ON DELETE CASCADE,
+    status TEXT DEFAULT 'pending',
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE INDEX IF NOT EXISTS idx_donations_status_expiry ON donations(status, expiry_date);
+-- Keyset pages of the available feed (status = ? ORDER BY donation_id)
+-- read this one instead of sorting a temp B-tree per page
+CREATE INDEX IF NOT EXISTS idx_donations_status_id ON donations(status, donation_id);
+CREATE INDEX IF NOT EXISTS idx_donations_user ON donations(user_id);
+CREATE INDEX IF NOT EXISTS idx_requests_ngo ON requests(ngo_id);
+CREATE INDEX IF NOT EXISTS idx_requests_donation ON requests(donation_id);
+-- users(email) is indexed by its UNIQUE constraint
+"""
+
+
+def page_clause(key, limit=None, after=None):
+    """
+    Keyset pagination suffix; returns (sql, params)
+    """
+    sql, params = "", []
+    if after is not None:
+        sql += f" AND {key} > ?"
+        params.append(after)
+    sql += f" ORDER BY {key}"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return sql, params
+
+
+def created_clause(column, since=None, until=None):
+    """
+    created_at range filter [since, until); returns (sql, params)
+    """
+    sql, params = "", []
+    if since is not None:
+        sql += f" AND {column} >= ?"
+        params.append(since)
+    if until is not None:
+        sql += f" AND {column} < ?"
+        params.append(until)
+    return sql, params
+
+
+def placeholders(values):
+    return ",".join("?" for _ in values)
+
+
+class SQLiteDatabaseManager(DatabaseManager):
+    """
+    Embedded SQLite backend in WAL mode with the README schema.
+
+    Statements run inline on the event loop: with the indexes above they
+    are sub-millisecond, which is cheaper than a thread hop per call.
+    """
+    def __init__(self, path="food_donation.db"):
+        self.path = path
+        self.conn = None
+
+    async def open(self):
+        if self.conn is not None:
+            return
+        self.conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.execute("PRAGMA busy_timeout=5000")
+        self.conn.executescript(SCHEMA)
+
+    async def warm_up(self, connections=1):
+        self.conn.execute("PRAGMA optimize")
+        self.conn.execute("SELECT COUNT(*) FROM donations WHERE status = 'available'").fetchone()
+
+    async def close(self):
+        if self.conn is not None:
+            self.conn.close()
+        self.conn = None
+
+    def _query(self, sql, params=()):
+        try:
+            rows = self.conn.execute(sql, params).fetchall()
+        except sqlite3.Error as e:
+            return QueryResponse(error=e)
+        return QueryResponse([dict(row) for row in rows])
+
+    def _insert(self, table, key, rows):
+        if not rows:
+            return QueryResponse()
+        columns = list(rows[0])
+        values = ",".join(f"({placeholders(columns)})" for _ in rows)
+        params = [row[c] for row in rows for c in columns]
+        response = self._query(
+            f"INSERT INTO {table} ({','.join(columns)}) VALUES {values} RETURNING *", params
+        )
+        response.data.sort(key=lambda row: row[key])
+        return response
+
+    # ---- Users ----
+    async def create_user(self, name, email, password, role):
+        return self._insert("users", "user_id", [{"name": name, "email": email, "password": password, "role": role}])
+
+    async def get_all_users(self, limit=None, after=None):
+        sql, params = page_clause("user_id", limit, after)
+        return self._query("SELECT * FROM users WHERE 1=1" + sql, params)
+
+    async def get_user_by_email(self, email):
+        return self._query("SELECT user_id, email, role FROM users WHERE email = ? LIMIT 1", (email,))
+
+    async def get_user_by_id(self, user_id):
+        return self._query("SELECT user_id, email, role FROM users WHERE user_id = ? LIMIT 1", (user_id,))
+
+    async def update_user(self, user_id, name=None, email=None, password=None, role=None):
+        update_data = {}
+        if name: update_data["name"] = name
+        if email: update_data["email"] = email
+        if password: update_data["password"] = password
+        if role: update_data["role"] = role
+        if not update_data:
+            return QueryResponse(error="Nothing to update")
+        assignments = ", ".join(f"{column} = ?" for column in update_data)
+        return self._query(
+            f"UPDATE users SET {assignments} WHERE user_id = ? RETURNING *", [*update_data.values(), user_id]
+        )
+
+    async def delete_user(self, user_id):
+        return self._query("DELETE FROM users WHERE user_id = ? RETURNING *", (user_id,))
+
+    # ---- Donations ----
+    async def create_donation(self, user_id, food_item, quantity, expiry_date):
+        return self._insert("donations", "donation_id", [{
+            "user_id": user_id,
+            "food_item": food_item,
+            "quantity": quantity,
+            "expiry_date": expiry_date,
+        }])
+
+    async def create_donations(self, rows):
+        return self._insert("donations", "donation_id", rows)
+
+    async def get_available_donations(self, limit=None, after=None):
+        sql, params = page_clause("donation_id", limit, after)
+        return self._query("SELECT * FROM donations WHERE status = 'available'" + sql, params)
+
+    async def get_donations_by_user(self, user_id):
+        return self._query("SELECT * FROM donations WHERE user_id = ? ORDER BY donation_id", (user_id,))
+
+    async def get_all_donations(self, limit=None, after=None, since=None, until=None):
+        where, where_params = created_clause("created_at", since, until)
+        sql, params = page_clause("donation_id", limit, after)
+        return self._query("SELECT * FROM donations WHERE 1=1" + where + sql, [*where_params, *params])
+
+    async def update_donation_status(self, donation_id, status, unless=None):
+        return await self.update_donation_statuses([donation_id], status, unless)
+
+    async def update_donation_statuses(self, donation_ids, status, unless=None):
+        guard = " AND status != ?" if unless else ""
+        return self._query(
+            f"UPDATE donations SET status = ? WHERE donation_id IN ({placeholders(donation_ids)}){guard} RETURNING *",
+            [status, *donation_ids, *([unless] if unless else [])],
+        )
+
+    async def transition_donation_statuses(self, donation_ids, from_status, to_status):
+        return self._query(
+            f"UPDATE donations SET status = ? WHERE donation_id IN ({placeholders(donation_ids)}) "
+            "AND status = ? RETURNING *",
+            [to_status, *donation_ids, from_status],
+        )
+
+    async def delete_donation(self, donation_id):
+        return self._query("DELETE FROM donations WHERE donation_id = ? RETURNING *", (donation_id,))
+
+    # ---- Requests ----
+    async def create_request(self, ngo_id, donation_id):
+        return self._insert("requests", "request_id", [{"ngo_id": ngo_id, "donation_id": donation_id, "status": "pending"}])
+
+    async def create_requests(self, rows):
+        return self._insert("requests", "request_id", [
+            {"ngo_id": ngo_id, "donation_id": donation_id, "status": "pending"}
+            for ngo_id, donation_id in rows
+        ])
+
+    async def get_requests_by_status(self, status, limit=None, after=None):
+        sql, params = page_clause("request_id", limit, after)
+        return self._query(
+            "SELECT request_id, ngo_id, donation_id, status FROM requests WHERE status = ?" + sql, [status, *params]
+        )
+
+    async def get_requests_by_ngo(self, ngo_id, limit=None, after=None):
+        sql, params = page_clause("request_id", limit, after)
+        return self._query("SELECT * FROM requests WHERE ngo_id = ?" + sql, [ngo_id, *params])
+
+    async def get_all_requests(self, limit=None, after=None):
+        sql, params = page_clause("request_id", limit, after)
+        return self._query("SELECT * FROM requests WHERE 1=1" + sql, params)
+
+    async def get_requests_with_donation_info_by_ngo(self, ngo_id):
+        response = self._query(
+            "SELECT r.request_id, r.status, r.donation_id, d.donation_id AS d_id, d.food_item, d.quantity, "
+            "d.expiry_date, d.status AS d_status "
+            "FROM requests r LEFT JOIN donations d ON d.donation_id = r.donation_id "
+            "WHERE r.ngo_id = ? ORDER BY r.request_id", (ngo_id,)
+        )
+        response.data = [{
+            "request_id": row["request_id"],
+            "status": row["status"],
+            "donation_id": row["donation_id"],
+            "donations": {"food_item": row["food_item"], "quantity": row["quantity"],
+                          "expiry_date": row["expiry_date"], "status": row["d_status"]}
+            if row["d_id"] is not None else None,
+        } for row in response.data]
+        return response
+
+    async def get_requests_by_donor(self, user_id):
+        return self._query(
+            "SELECT r.request_id, r.ngo_id, r.donation_id, r.status FROM requests r "
+            "JOIN donations d ON d.donation_id = r.donation_id WHERE d.user_id = ? ORDER BY r.request_id", (user_id,)
+        )
+
+    async def update_request_status(self, request_id, status):
+        return self._query("UPDATE requests SET status = ? WHERE request_id = ? RETURNING *", (status, request_id))
+
+    async def update_request_statuses(self, request_ids, status):
+        return self._query(
+            f"UPDATE requests SET status = ? WHERE request_id IN ({placeholders(request_ids)}) RETURNING *",
+            [status, *request_ids],
+        )
+
+    async def delete_request(self, request_id):
+        return self._query("DELETE FROM requests WHERE request_id = ? RETURNING *", (request_id,))
+
+    async def get_request_status_by_donation(self, donation_id):
+        return self._query("SELECT request_id, ngo_id, status FROM requests WHERE donation_id = ?", (donation_id,))
+
+    async def get_all_requests_with_user_info(self, limit=None, after=None, since=None, until=None):
+        where, where_params = created_clause("r.created_at", since, until)
+        sql, params = page_clause("r.request_id", limit, after)
+        response = self._query(
+            "SELECT r.request_id, r.status, r.donation_id, r.ngo_id, r.created_at, u.user_id AS u_id, u.name, "
+            "d.donation_id AS d_id, d.food_item "
+            "FROM requests r LEFT JOIN users u ON u.user_id = r.ngo_id "
+            "LEFT JOIN donations d ON d.donation_id = r.donation_id WHERE 1=1" + where + sql,
+            [*where_params, *params],
+        )
+        response.data = [{
+            "request_id": row["request_id"],
+            "status": row["status"],
+            "donation_id": row["donation_id"],
+            "ngo_id": row["ngo_id"],
+            "created_at": row["created_at"],
+            "ngo": {"name": row["name"]} if row["u_id"] is not None else None,
+            "donations": {"food_item": row["food_item"]} if row["d_id"] is not None else None,
+        } for row in response.data]
+        return response
@@ -0,0 +1,259 @@
+import asyncio
+import time
+from collections import Counter
+from datetime import date, timedelta
+from sys import intern
+from src.logic import DONATION_STATUSES, REQUEST_STATUSES, db_pages
+
+RESCUED_STATUSES = ("accepted", "distributed")
+
+
+def quantity_of(row):
+    try:
+        return int(row.get("quantity") or 0)
+    except (TypeError, ValueError):
+        return 0
+
+
+def donation_state(row, previous=None, rescued_on=None):
+    """
+    The few fields of a donation row the counters depend on, as one small
+    tuple; repeated strings are interned so rows share them.
+
+    Rows carry no time of their status changes, so the day a donation was
+    rescued is the one it was first seen in RESCUED_STATUSES: kept from
+    previous while it stays there, otherwise rescued_on, falling back to
+    the day it was created
+    """
+    status = intern(row.get("status") or "available")
+    day = intern(str(row.get("created_at") or date.today())[:10])
+    rescued = None
+    if status in RESCUED_STATUSES:
+        rescued = previous[4] if previous is not None and previous[4] is not None else intern(rescued_on or day)
+    return (status, quantity_of(row), day, row.get("user_id"), rescued)
+
+
+def donation_contribution(state):
+    """
+    (counter, key, amount) increments one donation state adds to the totals
+    """
+    status, quantity, day, user_id, rescued = state
+    contribution = (
+        ("donations", status, 1),
+        ("quantity", status, quantity),
+        ("donated_per_day", day, quantity),
+        ("donor_donations", user_id, 1),
+        ("donor_quantity", user_id, quantity),
+    )
+    if rescued is not None:
+        contribution += (("rescued_per_day", rescued, quantity),)
+    return contribution
+
+
+def request_state(row):
+    return (intern(row.get("status") or "pending"), row.get("ngo_id"))
+
+
+def request_contribution(state):
+    status, ngo_id = state
+    return (("requests", status, 1), (f"ngo_{status}", ngo_id, 1))
+
+
+def acceptance_rate(accepted, rejected):
+    decided = accepted + rejected
+    return accepted / decided if decided else None
+
+
+class StatsCollector:
+    """
+    Aggregate counters over donations and requests, kept current from
+    manager write events so reads never scan the tables.
+
+    Each row's last state (status, quantity, days and owner; a few dozen
+    bytes) is remembered, so an event replaces its contribution rather
+    than adding to it: applying the same row twice is harmless.
+    A periodic cursor scan rebuilds the counters from scratch, replays the
+    events that arrived meanwhile, and records how far the two had drifted.
+
+    Quantities are rescued on the day a donation is seen moving into
+    RESCUED_STATUSES: the day of the event, or of the scan that first finds
+    it there. Donations already rescued when first scanned count on the
+    day they were created.
+    """
+    def __init__(self, donations, requests, page_size=500, interval=3600.0):
+        self.donations = donations
+        self.requests = requests
+        self.page_size = page_size
+        self.interval = interval
+        self.counters = {}
+        self.donation_rows = {}
+        self.request_rows = {}
+        self.pending = None
+        # Row states from before a rebuild, so a scan keeps their rescue days
+        self.known = None
+        self.task = None
+        self.reconciled_at = None
+        self.reconciliations = 0
+        self.last_drift = 0
+        self.last_reconcile_seconds = 0.0
+
+    # ---- Incremental maintenance ----
+    def _apply(self, contribution, sign):
+        for name, key, amount in contribution:
+            counter = self.counters.setdefault(name, Counter())
+            counter[key] += sign * amount
+            if not counter[key]:
+                del counter[key]
+
+    def _set(self, rows, row_id, state, contribution):
+        previous = rows.pop(row_id, None)
+        if previous is not None:
+            self._apply(contribution(previous), -1)
+        if state is not None:
+            self._apply(contribution(state), 1)
+            rows[row_id] = state
+
+    def on_donation_change(self, kind, rows, scanned=False):
+        if self.pending is not None:
+            self.pending.append(("on_donation_change", kind, rows))
+        today = date.today().isoformat()
+        for row in rows:
+            donation_id = row.get("donation_id")
+            state = None
+            if kind != "delete":
+                previous = self.donation_rows.get(donation_id)
+                if previous is None and self.known is not None:
+                    previous = self.known.get(donation_id)
+                # A scanned row never seen before may have been rescued any
+                # day since it was created
+                rescued_on = None if scanned and previous is None else today
+                state = donation_state(row, previous, rescued_on)
+            self._set(self.donation_rows, donation_id, state, donation_contribution)
+
+    def on_request_change(self, kind, rows):
+        if self.pending is not None:
+            self.pending.append(("on_request_change", kind, rows))
+        for row in rows:
+            self._set(self.request_rows, row.get("request_id"),
+                      None if kind == "delete" else request_state(row), request_contribution)
+
+    # ---- Reconciliation ----
+    async def reconcile(self):
+        """
+        Rebuild every counter from a full cursor scan and swap it in
+        """
+        start = time.perf_counter()
+        self.pending = []
+        try:
+            fresh = StatsCollector(self.donations, self.requests, self.page_size)
+            fresh.known = self.donation_rows
+            async for page in db_pages(self.donations.db.get_all_donations, "donation_id",
+                                       page_size=self.page_size):
+                fresh.on_donation_change("insert", page, scanned=True)
+            async for page in db_pages(self.requests.db.get_all_requests, "request_id",
+                                       page_size=self.page_size):
+                fresh.on_request_change("insert", page)
+            for listener, kind, rows in self.pending:
+                getattr(fresh, listener)(kind, rows)
+        finally:
+            self.pending = None
+        # The first scan is the initial load, not a correction
+        self.last_drift = 0 if not self.reconciliations else sum(
+            1 for rows, fresh_rows in ((self.donation_rows, fresh.donation_rows),
+                                       (self.request_rows, fresh.request_rows))
+            for row_id in rows.keys() | fresh_rows.keys()
+            if rows.get(row_id) != fresh_rows.get(row_id)
+        )
+        self.counters, self.donation_rows, self.request_rows = fresh.counters, fresh.donation_rows, fresh.request_rows
+        self.reconciled_at = time.time()
+        self.reconciliations += 1
+        self.last_reconcile_seconds = time.perf_counter() - start
+
+    async def run(self):
+        while True:
+            try:
+                await self.reconcile()
+            except Exception:
+                # Keep serving the incremental counters; retry next round
+                pass
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        self.donations.add_listener(self.on_donation_change)
+        self.requests.add_listener(self.on_request_change)
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    # ---- Reads ----
+    def counter(self, name):
+        return self.counters.get(name, Counter())
+
+    def summary(self, days=30):
+        """
+        Status totals, request acceptance and daily quantities for the last
+        days days: donated by the day donations were created, rescued by
+        the day they were accepted or distributed. The cost depends on
+        days, not on table sizes
+        """
+        donations, quantity, requests = self.counter("donations"), self.counter("quantity"), self.counter("requests")
+        donated, rescued = self.counter("donated_per_day"), self.counter("rescued_per_day")
+        today = date.today()
+        per_day = []
+        for offset in range(days - 1, -1, -1):
+            day = (today - timedelta(days=offset)).isoformat()
+            per_day.append({"day": day, "donated": donated[day], "rescued": rescued[day]})
+        return {
+            "donations": {status: donations[status] for status in DONATION_STATUSES},
+            "donations_total": len(self.donation_rows),
+            "quantity": {status: quantity[status] for status in DONATION_STATUSES},
+            "quantity_rescued": sum(quantity[status] for status in RESCUED_STATUSES),
+            "requests": {status: requests[status] for status in REQUEST_STATUSES},
+            "requests_total": len(self.request_rows),
+            "acceptance_rate": acceptance_rate(requests["accepted"], requests["rejected"]),
+            "quantity_per_day": per_day,
+            "reconciled_at": self.reconciled_at,
+            "last_drift": self.last_drift,
+        }
+
+    def donor(self, user_id):
+        return {
+            "user_id": user_id,
+            "donations": self.counter("donor_donations")[user_id],
+            "quantity": self.counter("donor_quantity")[user_id],
+        }
+
+    def ngo(self, ngo_id):
+        counts = {status: self.counter(f"ngo_{status}")[ngo_id] for status in REQUEST_STATUSES}
+        return {
+            "ngo_id": ngo_id,
+            "requests": sum(counts.values()),
+            **counts,
+            "acceptance_rate": acceptance_rate(counts["accepted"], counts["rejected"]),
+        }
+
+    def donors(self):
+        user_ids = sorted(u for u in self.counter("donor_donations") if u is not None)
+        return [self.donor(user_id) for user_id in user_ids]
+
+    def ngos(self):
+        ngo_ids = set()
+        for status in REQUEST_STATUSES:
+            ngo_ids |= self.counter(f"ngo_{status}").keys()
+        return [self.ngo(ngo_id) for ngo_id in sorted(n for n in ngo_ids if n is not None)]
+
+    def stats(self):
+        return {
+            "donations": len(self.donation_rows),
+            "requests": len(self.request_rows),
+            "reconciliations": self.reconciliations,
+            "last_drift": self.last_drift,
+            "last_reconcile_seconds": self.last_reconcile_seconds,
+        }
@@ -0,0 +1,65 @@
+import asyncio
+import time
+
+
+class Warmup:
+    """
+    Runs named warm-up steps in the background once the server is
+    accepting connections, so liveness answers immediately while readiness
+    waits for pooled connections, primed caches and in-memory indexes.
+
+    Steps run in order; a failing step is retried after retry_delay until
+    it succeeds, and the service only reports ready when all have.
+    """
+    def __init__(self, retry_delay=5.0):
+        self.retry_delay = retry_delay
+        self.steps = []
+        self.timings = {}
+        self.errors = {}
+        self.ready = False
+        self.started_at = None
+        self.ready_seconds = None
+        self.task = None
+
+    def add(self, name, step):
+        """
+        Register step, a coroutine function run with no arguments
+        """
+        self.steps.append((name, step))
+
+    async def run(self):
+        for name, step in self.steps:
+            while True:
+                start = time.perf_counter()
+                try:
+                    await step()
+                except Exception as e:
+                    self.errors[name] = repr(e)
+                    await asyncio.sleep(self.retry_delay)
+                    continue
+                self.timings[name] = time.perf_counter() - start
+                self.errors.pop(name, None)
+                break
+        self.ready = True
+        self.ready_seconds = time.perf_counter() - self.started_at
+
+    def start(self):
+        self.started_at = time.perf_counter()
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+    def status(self):
+        return {
+            "ready": self.ready,
+            "ready_seconds": self.ready_seconds,
+            "steps": {name: self.timings.get(name) for name, _ in self.steps},
+            "errors": self.errors,
+        }
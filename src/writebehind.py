@@ -0,0 +1,128 @@
+import asyncio
+import time
+
+
+class WriteBehind:
+    """
+    Micro-batches single-row writes into multi-row ones.
+
+    submit() queues an item and waits for its own result, so callers see
+    the same contract as a direct write. A single background flusher takes
+    whatever is queued, up to max_batch items, and hands the batch to
+    flush(items), which returns one result per item in order. Writes that
+    arrive while a batch is being written make up the next one, so batches
+    grow with load on their own; max_delay adds a wait for a batch to fill,
+    trading latency for fewer round trips. The queue is bounded: when it
+    is full, submit() waits, which slows producers to the backend's pace.
+    """
+    def __init__(self, flush, max_batch=100, max_delay=0.0, max_queue=1000):
+        self.flush = flush
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.queue = asyncio.Queue(max_queue)
+        self.task = None
+        self.stopping = False
+        self.batch = []
+        self.batches = 0
+        self.items = 0
+        self.largest_batch = 0
+        self.flush_seconds = 0.0
+
+    async def submit(self, item):
+        if self.task is None or self.stopping:
+            return (await self.flush([item]))[0]
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((item, future))
+        return await future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                if not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            self.batch = batch
+            await self._flush(batch)
+            self.batch = []
+
+    async def _flush(self, batch):
+        # Whatever goes wrong, every caller in the batch gets an answer and
+        # the flusher lives on to take the next batch
+        start = time.perf_counter()
+        try:
+            results, error = await self.flush([item for item, _ in batch]), None
+            if len(results) != len(batch):
+                raise RuntimeError(f"flush returned {len(results)} results for {len(batch)} items")
+        except Exception as e:
+            results, error = None, e
+        for i, (_, future) in enumerate(batch):
+            if not future.done():
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(results[i])
+            self.queue.task_done()
+        self.flush_seconds += time.perf_counter() - start
+        self.batches += 1
+        self.items += len(batch)
+        self.largest_batch = max(self.largest_batch, len(batch))
+
+    def start(self):
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self, timeout=10.0):
+        """
+        Flush what is already queued, then stop the flusher. New writes go
+        straight to flush() meanwhile; callers still waiting after timeout
+        get an error instead of hanging.
+        """
+        if self.task is None:
+            return
+        self.stopping = True
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self.task.cancel()
+        try:
+            await self.task
+        except asyncio.CancelledError:
+            pass
+        self.task = None
+        error = RuntimeError("write-behind queue stopped before this write was flushed")
+        pending = list(self.batch)
+        self.batch = []
+        for _ in pending:
+            self.queue.task_done()
+        # Producers blocked on a full queue enqueue as it drains: keep
+        # draining until they have all gone through
+        while pending or not self.queue.empty():
+            while not self.queue.empty():
+                pending.append(self.queue.get_nowait())
+                self.queue.task_done()
+            for _, future in pending:
+                if not future.done():
+                    future.set_exception(error)
+            pending = []
+            await asyncio.sleep(0)
+        self.stopping = False
+
+    def stats(self):
+        return {
+            "queued": self.queue.qsize(),
+            "batches": self.batches,
+            "items": self.items,
+            "largest_batch": self.largest_batch,
+            "mean_batch": self.items / self.batches if self.batches else 0.0,
+            "flush_seconds": self.flush_seconds,
+        }
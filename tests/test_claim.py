@@ -0,0 +1,121 @@
+import asyncio
+import threading
+import pytest
+from src.logic import DonationManager, RequestManager, UserManager
+from src.sqlite_db import SQLiteDatabaseManager
+
+NGOS = 8
+DONATIONS = 30
+
+
+@pytest.fixture
+def database(tmp_path):
+    """
+    A SQLite file with one donor (user 1), NGOS NGOs (users 2..) and
+    DONATIONS available donations
+    """
+    path = str(tmp_path / "claim.db")
+
+    async def seed():
+        db = SQLiteDatabaseManager(path)
+        await db.open()
+        await db.create_user("donor", "donor@example.org", "x", "donor")
+        for n in range(NGOS):
+            await db.create_user(f"ngo{n}", f"ngo{n}@example.org", "x", "ngo")
+        await db.create_donations([
+            {"user_id": 1, "food_item": f"item{i}", "quantity": 1, "expiry_date": "2030-01-01"}
+            for i in range(DONATIONS)
+        ])
+        await db.close()
+
+    asyncio.run(seed())
+    return path
+
+
+def test_racing_threads_claim_each_donation_once(database):
+    barrier = threading.Barrier(NGOS)
+    wins = [[] for _ in range(NGOS)]
+    conflicts = [0] * NGOS
+    failures = []
+
+    def ngo(n):
+        async def race():
+            db = SQLiteDatabaseManager(database)
+            await db.open()
+            requests = RequestManager(db, donations=DonationManager(db))
+            for donation_id in range(1, DONATIONS + 1):
+                barrier.wait()
+                result = await requests.create_request(n + 2, donation_id)
+                if result["Success"]:
+                    wins[n].append(donation_id)
+                elif result.get("Conflict"):
+                    conflicts[n] += 1
+                else:
+                    failures.append(result)
+            await db.close()
+        asyncio.run(race())
+
+    threads = [threading.Thread(target=ngo, args=(n,)) for n in range(NGOS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert not failures
+    assert sorted(d for won in wins for d in won) == list(range(1, DONATIONS + 1))
+    assert sum(conflicts) == DONATIONS * (NGOS - 1)
+
+    async def stored():
+        db = SQLiteDatabaseManager(database)
+        await db.open()
+        requests, donations = (await db.get_all_requests()).data, (await db.get_all_donations()).data
+        await db.close()
+        return requests, donations
+
+    requests, donations = asyncio.run(stored())
+    assert sorted(r["donation_id"] for r in requests) == list(range(1, DONATIONS + 1))
+    assert {d["status"] for d in donations} == {"requested"}
+
+
+def test_deleting_an_ngo_releases_its_claimed_donations(database):
+    async def scenario():
+        db = SQLiteDatabaseManager(database)
+        await db.open()
+        donations = DonationManager(db)
+        requests = RequestManager(db, donations=donations)
+        users = UserManager(db, donations=donations, requests=requests)
+        assert (await requests.create_request(2, 1))["Success"]
+        assert (await users.delete_user(2))["Success"]
+        status = (await db.get_all_donations(limit=1)).data[0]["status"]
+        left = (await db.get_all_requests()).data
+        retry = await requests.create_request(3, 1)
+        await db.close()
+        return status, left, retry
+
+    status, left, retry = asyncio.run(scenario())
+    assert status == "available"
+    assert left == []
+    assert retry["Success"]
+
+
+def test_manual_status_updates_leave_claims_alone(database):
+    async def scenario():
+        db = SQLiteDatabaseManager(database)
+        await db.open()
+        donations = DonationManager(db)
+        requests = RequestManager(db, donations=donations)
+        into_claim = await donations.update_donation_status(1, "requested")
+        assert (await requests.create_request(2, 2))["Success"]
+        out_of_claim = await donations.update_donation_status(2, "available")
+        batch = await donations.update_donation_statuses([2, 3], "distributed")
+        second = await requests.create_request(3, 2)
+        statuses = {d["donation_id"]: d["status"] for d in (await db.get_all_donations(limit=3)).data}
+        await db.close()
+        return into_claim, out_of_claim, batch, second, statuses
+
+    into_claim, out_of_claim, batch, second, statuses = asyncio.run(scenario())
+    assert not into_claim["Success"]
+    assert not out_of_claim["Success"]
+    assert [d["donation_id"] for d in batch["Data"]] == [3]
+    assert second.get("Conflict")
+    assert statuses == {1: "available", 2: "requested", 3: "distributed"}
@@ -0,0 +1,51 @@
+import asyncio
+from src.events import ChangeFeed
+
+
+def test_one_task_fans_out_to_every_subscriber():
+    async def fan_out():
+        feed = ChangeFeed(buffer_size=10)
+        before = len(asyncio.all_tasks())
+        feed.start()
+        queues = [feed.subscribe() for _ in range(1_000)]
+        for queue in queues:
+            assert queue.get_nowait()[1] == "reset"
+        tasks = len(asyncio.all_tasks()) - before
+
+        feed.on_change("insert", [{"donation_id": 1, "status": "available"}])
+        while feed.inbox.qsize():
+            await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        events = [queue.get_nowait() for queue in queues if queue.qsize()]
+        await feed.stop()
+        return tasks, events
+
+    tasks, events = asyncio.run(fan_out())
+    assert tasks == 1
+    assert len(events) == 1_000
+    assert all(event[1] == "insert" and event[2] == [{"donation_id": 1, "status": "available"}] for event in events)
+    assert len({event[0] for event in events}) == 1
+
+
+def test_slow_subscriber_is_dropped_and_resumes_from_history():
+    async def overflow():
+        feed = ChangeFeed(buffer_size=2, history_size=10)
+        feed.start()
+        slow = feed.subscribe()
+        slow.get_nowait()
+        for i in range(3):
+            feed.on_change("insert", [{"donation_id": i}])
+        while feed.inbox.qsize():
+            await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        received = [slow.get_nowait() for _ in range(slow.qsize())]
+        resumed = feed.subscribe(received[0][0])
+        replay = [resumed.get_nowait() for _ in range(resumed.qsize())]
+        stats = feed.stats()
+        await feed.stop()
+        return received, replay, stats
+
+    received, replay, stats = asyncio.run(overflow())
+    assert received[-1] is None
+    assert stats["dropped"] == 1
+    assert [event[2][0]["donation_id"] for event in replay] == [1, 2]